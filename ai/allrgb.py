@@ -1,22 +1,1007 @@
-# Import the necessary libraries
+#!/usr/bin/env python3
+"""
+Generate an allRGB image: every one of the 16,777,216 24-bit colours used
+exactly once on a 4096x4096 canvas.
+
+Colours are laid down in an order (shuffled, along a Hilbert or Morton curve
+through the RGB cube, or sorted by HSV/Lab) onto pixels visited in a walk
+(raster by default, or a Hilbert curve). Smaller palettes (--bits 15 =
+256x128, --bits 18 = 512x512) keep the one-pixel-per-colour rule.
+
+--order grow grows the image from the centre instead: every new pixel gets
+the unused colour nearest to its placed neighbours, looked up in a bucketed
+grid over the remaining colours. Long runs can be checkpointed and resumed.
+
+--bands N streams the PNG in bands of N rows instead of building the whole
+raster: every band's colours follow from its pixel positions, so bands are
+computed, filtered and deflated in a process pool and written in order.
+This also makes larger palettes possible (--bits 27/30 with 16-bit samples).
+
+--photo remaps a photo: pixels and colours are both sorted by luminance
+bucket and hue and matched rank for rank, optionally followed by rounds of
+batch pair swaps (--refine) that lower the colour error.
+
+--verify checks existing images: every colour used exactly once, plus
+neighbour colour-distance statistics as a smoothness score.
+
+Requires:
+    pip install numpy pillow
+
+Examples:
+    python allrgb.py
+    python allrgb.py --seed 42 --out shuffled_colors.png
+    python allrgb.py --order hilbert --walk hilbert --out hilbert.png
+    python allrgb.py --order hsv --walk raster --bits 15 --out hsv-15bit.png
+    python allrgb.py --order grow --seed 7 --checkpoint grow.npz --out grown.png
+    python allrgb.py --order hilbert --bands 256 --depth 16 --out hilbert-16bit.png
+    python allrgb.py --photo portrait.jpg --refine 8 --out portrait-allrgb.png
+    python allrgb.py --verify shuffled_colors.png hilbert.png
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import math
+import multiprocessing
+import os
 import random
+import struct
+import sys
+import zlib
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
 from PIL import Image
 
-# Create a new image with the appropriate dimensions
-width = 4096  # The image should be 4096 by 4096 pixels
-height = 4096
-image = Image.new("RGB", (width, height))
+# the streaming PNG writer lives at the repository root, shared with the other image scripts
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from pngstream import PNG_SIGNATURE, write_png_parts  # noqa: E402
+
+BITS = 24  # 8 bits per channel: 4096x4096 pixels, one per colour
+HUE_BINS = 360
+LIGHTNESS_BINS = 256
+
+
+# ---------- canvas and palette ----------
+
+def canvas_size(bits: int) -> Tuple[int, int]:
+    # One pixel per colour: 2**bits pixels, square or 2:1 for odd exponents
+    return 1 << ((bits + 1) // 2), 1 << (bits // 2)
+
+
+def channel_bits(bits: int) -> int:
+    if bits % 3:
+        raise SystemExit(f"--bits must be a multiple of 3, got {bits}")
+    return bits // 3
+
+
+def level_lut(cbits: int) -> np.ndarray:
+    # Spread 2**cbits channel levels over the full 0..255 range
+    n = 1 << cbits
+    return np.round(np.arange(n) * 255.0 / (n - 1)).astype(np.uint8)
+
+
+def pack(r: np.ndarray, g: np.ndarray, b: np.ndarray, cbits: int) -> np.ndarray:
+    return ((r.astype(np.uint32) << (2 * cbits)) | (g.astype(np.uint32) << cbits) | b.astype(np.uint32))
+
+
+def unpack(colors: np.ndarray, cbits: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    mask = (1 << cbits) - 1
+    return (colors >> (2 * cbits)) & mask, (colors >> cbits) & mask, colors & mask
+
+
+# ---------- space-filling curves (vectorized over every index at once) ----------
+
+def deinterleave(d: np.ndarray, bits: int, dims: int) -> List[np.ndarray]:
+    # Bit b of axis i is bit (b * dims + dims - 1 - i) of d: the Morton
+    # (Z-order) decode, and Skilling's "transpose" form of a Hilbert index.
+    # Done a few bits per axis at a time through a small lookup table.
+    step = max(1, 12 // dims)
+    codes = np.arange(1 << (step * dims))
+    luts = [np.zeros(codes.size, dtype=d.dtype) for _ in range(dims)]
+    for b in range(step):
+        for i in range(dims):
+            luts[i] |= (((codes >> (b * dims + dims - 1 - i)) & 1) << b).astype(d.dtype)
+
+    axes = [np.zeros_like(d) for _ in range(dims)]
+    for b in range(0, bits, step):
+        chunk = (d >> (b * dims)) & ((1 << (step * dims)) - 1)
+        for i in range(dims):
+            axes[i] |= luts[i][chunk] << b
+    return axes
+
+
+def morton_axes(d: np.ndarray, bits: int, dims: int) -> List[np.ndarray]:
+    return deinterleave(d, bits, dims)
+
+
+def hilbert_axes(d: np.ndarray, bits: int, dims: int) -> List[np.ndarray]:
+    # Skilling's TransposetoAxes; the per-element "if x[i] & q" branches are
+    # turned into all-ones/all-zeros masks so everything stays bitwise
+    x = deinterleave(d, bits, dims)
+    t = x[dims - 1] >> 1
+    for i in range(dims - 1, 0, -1):
+        x[i] ^= x[i - 1]
+    x[0] ^= t
+
+    for qbit in range(1, bits):
+        p = (1 << qbit) - 1
+        for i in range(dims - 1, -1, -1):
+            miss = ((x[i] >> qbit) & 1) - 1  # 0 where bit q is set, -1 where not
+            if i == 0:
+                x[0] ^= p & ~miss
+                continue
+            t = (x[0] ^ x[i]) & p & miss
+            x[0] ^= t | (p & ~miss)
+            x[i] ^= t
+    return x
+
+
+def interleave(axes: Sequence[np.ndarray], bits: int, dims: int) -> np.ndarray:
+    # Inverse of deinterleave()
+    d = np.zeros_like(axes[0])
+    for b in range(bits):
+        for i in range(dims):
+            d |= ((axes[i] >> b) & 1) << (b * dims + dims - 1 - i)
+    return d
+
+
+def hilbert_index(axes: Sequence[np.ndarray], bits: int, dims: int) -> np.ndarray:
+    # Skilling's AxestoTranspose, the inverse of hilbert_axes()
+    x = [a.copy() for a in axes]
+    for qbit in range(bits - 1, 0, -1):
+        p = (1 << qbit) - 1
+        for i in range(dims):
+            miss = ((x[i] >> qbit) & 1) - 1
+            if i == 0:
+                x[0] ^= p & ~miss
+                continue
+            t = (x[0] ^ x[i]) & p & miss
+            x[0] ^= t | (p & ~miss)
+            x[i] ^= t
+
+    for i in range(1, dims):
+        x[i] ^= x[i - 1]
+    t = np.zeros_like(x[0])
+    for qbit in range(bits - 1, 0, -1):
+        t ^= -((x[dims - 1] >> qbit) & 1) & ((1 << qbit) - 1)
+    for i in range(dims):
+        x[i] ^= t
+    return interleave(x, bits, dims)
+
+
+def curve_axes(
+    curve: Callable[[np.ndarray, int, int], List[np.ndarray]],
+    count: int,
+    bits: int,
+    dims: int,
+    chunk: int = 1 << 14,
+) -> List[np.ndarray]:
+    # Evaluate a curve for indices 0..count-1 in cache-sized chunks; the
+    # bit-twiddling is memory bound and runs ~4x faster this way
+    out = [np.empty(count, dtype=np.int32) for _ in range(dims)]
+    for start in range(0, count, chunk):
+        d = np.arange(start, min(count, start + chunk), dtype=np.int32)
+        for axis, values in zip(out, curve(d, bits, dims)):
+            axis[start:start + d.size] = values
+    return out
+
+
+# ---------- colour orderings: the sequence in which colours are laid down ----------
+
+def all_levels(bits: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    return unpack(np.arange(1 << bits, dtype=np.uint32), channel_bits(bits))
+
+
+def order_shuffle(bits: int, rng: np.random.Generator) -> np.ndarray:
+    # Every colour packed as 0xRRGGBB, shuffled in place (64 MB as uint32)
+    colors = np.arange(1 << bits, dtype=np.uint32)
+    rng.shuffle(colors)
+    return colors
+
+
+def hilbert_at(d: np.ndarray, bits: int) -> np.ndarray:
+    cbits = channel_bits(bits)
+    return pack(*hilbert_axes(d, cbits, 3), cbits)
+
+
+def morton_at(d: np.ndarray, bits: int) -> np.ndarray:
+    cbits = channel_bits(bits)
+    return pack(*morton_axes(d, cbits, 3), cbits)
+
+
+def order_hilbert(bits: int, rng: np.random.Generator) -> np.ndarray:
+    cbits = channel_bits(bits)
+    r, g, b = curve_axes(hilbert_axes, 1 << bits, cbits, 3)
+    return pack(r, g, b, cbits)
+
+
+def order_morton(bits: int, rng: np.random.Generator) -> np.ndarray:
+    cbits = channel_bits(bits)
+    r, g, b = curve_axes(morton_axes, 1 << bits, cbits, 3)
+    return pack(r, g, b, cbits)
+
+
+def order_hsv(bits: int, rng: np.random.Generator) -> np.ndarray:
+    # Sweep through hue bins, dark to bright and grey to saturated within each
+    cbits = channel_bits(bits)
+    r, g, b = (c.astype(np.int32) for c in all_levels(bits))
+    mx = np.maximum(np.maximum(r, g), b)
+    mn = np.minimum(np.minimum(r, g), b)
+    delta = (mx - mn).astype(np.float32)
+    safe = np.where(delta == 0, 1, delta)
+    hue = np.where(mx == r, (g - b) / safe, np.where(mx == g, 2 + (b - r) / safe, 4 + (r - g) / safe))
+    hue = np.where(delta == 0, 0, hue) % 6
+    hue_bin = (hue * (HUE_BINS / 6)).astype(np.int64)
+    sat = np.where(mx == 0, 0, delta * 255 / np.where(mx == 0, 1, mx)).astype(np.int64)
+    key = (hue_bin << (cbits + 8)) | (mx.astype(np.int64) << 8) | sat
+    return np.argsort(key, kind="stable").astype(np.uint32)
+
+
+def order_lab(bits: int, rng: np.random.Generator) -> np.ndarray:
+    # Sweep through CIE L* bins, sorted by a*b* hue angle within each
+    cbits = channel_bits(bits)
+    v = level_lut(cbits).astype(np.float32) / 255
+    linear = np.where(v <= 0.04045, v / 12.92, ((v + 0.055) / 1.055) ** 2.4).astype(np.float32)
+    r, g, b = (linear[c] for c in all_levels(bits))
+
+    def f(t: np.ndarray) -> np.ndarray:
+        return np.where(t > 216 / 24389, np.cbrt(t), (24389 / 27 * t + 16) / 116)
+
+    fx = f((0.4124 * r + 0.3576 * g + 0.1805 * b) / 0.95047)
+    fy = f(0.2126 * r + 0.7152 * g + 0.0722 * b)
+    fz = f((0.0193 * r + 0.1192 * g + 0.9505 * b) / 1.08883)
+    lightness = 116 * fy - 16
+    angle = np.arctan2(200 * (fy - fz), 500 * (fx - fy))
+
+    l_bin = np.clip(lightness * (LIGHTNESS_BINS / 100), 0, LIGHTNESS_BINS - 1).astype(np.int64)
+    a_bin = ((angle + np.pi) * (0xFFFF / (2 * np.pi))).astype(np.int64)
+    return np.argsort((l_bin << 16) | a_bin, kind="stable").astype(np.uint32)
+
+
+ORDERINGS: Dict[str, Callable[[int, np.random.Generator], np.ndarray]] = {
+    "shuffle": order_shuffle,
+    "hilbert": order_hilbert,
+    "morton": order_morton,
+    "hsv": order_hsv,
+    "lab": order_lab,
+}
+
+
+# ---------- canvas walks: the sequence in which pixels are visited ----------
+
+def walk_raster(width: int, height: int) -> np.ndarray:
+    return np.arange(width * height, dtype=np.int64)
+
+
+def walk_hilbert(width: int, height: int) -> np.ndarray:
+    # A Hilbert curve per height x height square, squares side by side
+    side_bits = height.bit_length() - 1
+    per_square = height * height
+    x, y = curve_axes(hilbert_axes, per_square, side_bits, 2)
+    if side_bits and x[-1] == 0:
+        # make each square end on its right edge, next to the following one
+        x, y = y, x
+    walk = y * width + x
+    if width == height:
+        return walk
+    return np.concatenate([walk, walk + height])
+
+
+WALKS: Dict[str, Callable[[int, int], np.ndarray]] = {
+    "hilbert": walk_hilbert,
+    "raster": walk_raster,
+}
+
+
+def hilbert_swapped(side_bits: int) -> bool:
+    # Whether walk_hilbert() transposes each square (see there)
+    if not side_bits:
+        return False
+    x, _ = hilbert_axes(np.array([(1 << (2 * side_bits)) - 1], dtype=np.int32), side_bits, 2)
+    return bool(x[0] == 0)
+
+
+def walk_index(walk: str, x: np.ndarray, y: np.ndarray, width: int, height: int) -> np.ndarray:
+    # Position of pixels (x, y) along a walk: the inverse of WALKS[walk]
+    if walk == "raster":
+        return y * width + x
+    side_bits = height.bit_length() - 1
+    local = x & (height - 1)
+    axes = (y, local) if hilbert_swapped(side_bits) else (local, y)
+    return ((x >> side_bits) << (2 * side_bits)) + hilbert_index(axes, side_bits, 2)
+
+
+def render(colors: np.ndarray, walk: np.ndarray) -> np.ndarray:
+    # The i-th colour goes to the i-th pixel of the walk
+    placed = np.empty_like(colors)
+    placed[walk] = colors
+    return placed
+
+
+# ---------- photo remapping ----------
+
+LUMINANCE_BUCKETS = 1024
+HUE_STEPS = 4096
+
+
+def load_photo(path: Path, width: int, height: int) -> np.ndarray:
+    # Scale to cover the canvas and crop the centre
+    with Image.open(path.expanduser()) as photo:
+        photo = photo.convert("RGB")
+        scale = max(width / photo.width, height / photo.height)
+        size = (max(width, round(photo.width * scale)), max(height, round(photo.height * scale)))
+        photo = photo.resize(size, Image.Resampling.LANCZOS)
+        left, top = (size[0] - width) // 2, (size[1] - height) // 2
+        return np.asarray(photo.crop((left, top, left + width, top + height)))
+
+
+def luminance_hue_keys(rgb: np.ndarray) -> np.ndarray:
+    # Rank by luminance into equal-sized buckets, and by hue within a bucket
+    r, g, b = (rgb[:, i].astype(np.int32) for i in range(3))
+    luminance = 299 * r + 587 * g + 114 * b
+    hue = np.arctan2(np.float32(np.sqrt(3)) * (g - b), 2 * r - g - b)
+    hue = ((hue + np.pi) * (HUE_STEPS / (2 * np.pi))).astype(np.int64).clip(0, HUE_STEPS - 1)
+
+    n = rgb.shape[0]
+    buckets = min(LUMINANCE_BUCKETS, n)
+    bucket = np.empty(n, dtype=np.int64)
+    bucket[np.argsort(luminance)] = np.arange(n) // (n // buckets)
+    return bucket * HUE_STEPS + hue
+
+
+def refine_swaps(pixels: np.ndarray, assigned: np.ndarray, order: np.ndarray, rounds: int, rng: np.random.Generator) -> None:
+    # Batch pair swaps: pair positions k and k + s along the sorted pixel
+    # order (disjoint by construction) and swap every pair that lowers the
+    # squared colour error. Updates `assigned` in place.
+    n = order.size
+
+    def error(p: np.ndarray, c: np.ndarray) -> np.ndarray:
+        diff = p - c
+        diff *= diff
+        return diff.sum(axis=1, dtype=np.int32)
+
+    for _ in range(rounds):
+        s = int(rng.integers(1, 64))
+        blocks = n // (2 * s)
+        first = ((np.arange(blocks) * (2 * s))[:, None] + np.arange(s)).ravel()
+        i, j = order[first], order[first + s]
+        pi, pj, ci, cj = pixels[i], pixels[j], assigned[i], assigned[j]
+        better = error(pi, cj) + error(pj, ci) < error(pi, ci) + error(pj, cj)
+        assigned[i[better]], assigned[j[better]] = cj[better], ci[better]
+
+
+def photo_colors(path: Path, bits: int, rng: np.random.Generator, refine: int = 0) -> np.ndarray:
+    # Use every colour once, assigned so the image approximates the photo:
+    # pixels and colours are both sorted by (luminance bucket, hue) and
+    # matched rank for rank
+    cbits = channel_bits(bits)
+    width, height = canvas_size(bits)
+    pixels = load_photo(path, width, height).reshape(-1, 3).astype(np.int32)
+
+    lut = level_lut(cbits)
+    palette = np.stack([lut[c] for c in all_levels(bits)], axis=1).astype(np.int32)
+
+    pixel_order = np.argsort(luminance_hue_keys(pixels))
+    color_order = np.argsort(luminance_hue_keys(palette))
+    assigned = np.empty_like(pixels)
+    assigned[pixel_order] = palette[color_order]
+    refine_swaps(pixels, assigned, pixel_order, refine, rng)
+
+    inverse = np.zeros(256, dtype=np.uint32)
+    inverse[lut] = np.arange(lut.size, dtype=np.uint32)
+    return pack(*(inverse[assigned[:, i]] for i in range(3)), cbits)
+
+
+# ---------- streamed row bands ----------
+
+BAND_CHUNK = 1 << 14  # pixels evaluated at once inside a band, see curve_axes()
+
+# Orderings whose i-th colour can be computed on its own; the others are
+# computed once in the parent and shared with the workers as a table
+INDEXED_ORDERINGS: Dict[str, Callable[[np.ndarray, int], np.ndarray]] = {
+    "hilbert": hilbert_at,
+    "morton": morton_at,
+}
+
+_band: Dict[str, object] = {}
+
+
+def sample_lut(cbits: int, depth: int) -> np.ndarray:
+    # Channel levels spread over the full 8- or 16-bit sample range
+    if depth == 8:
+        return level_lut(cbits)
+    n = 1 << cbits
+    return np.round(np.arange(n) * 65535.0 / (n - 1)).astype(np.uint16)
+
+
+def init_band_worker(spec: Dict[str, object]) -> None:
+    _band.clear()
+    _band.update(spec)
+    if spec["table"]:
+        shm = shared_memory.SharedMemory(name=spec["table"])
+        _band["shm"] = shm  # keep the mapping alive as long as the worker
+        _band["colors"] = np.ndarray((1 << spec["bits"],), dtype=np.uint32, buffer=shm.buf)
+
+
+def band_colors(y0: int, y1: int) -> np.ndarray:
+    # Packed colours of rows y0..y1-1, computed from the pixel positions alone
+    width, height, bits = _band["width"], _band["height"], _band["bits"]
+    out = np.empty((y1 - y0) * width, dtype=np.uint32)
+    for start in range(0, out.size, BAND_CHUNK):
+        p = np.arange(start, min(out.size, start + BAND_CHUNK), dtype=np.int32)
+        d = walk_index(_band["walk"], p % width, p // width + y0, width, height)
+        if "colors" in _band:
+            out[start:start + p.size] = _band["colors"][d]
+        else:
+            out[start:start + p.size] = INDEXED_ORDERINGS[_band["order"]](d, bits)
+    return out
+
+
+def encode_band(rows: Tuple[int, int]) -> Tuple[bytes, int, int]:
+    # Filter (PNG "Up") and deflate one band; the row above the band is
+    # recomputed, so every band is independent of the others
+    y0, y1 = rows
+    width, depth = _band["width"], _band["depth"]
+    cbits = channel_bits(_band["bits"])
+    lut = sample_lut(cbits, depth)
+
+    top = max(0, y0 - 1)
+    colors = band_colors(top, y1).reshape(-1, width)
+    samples = np.stack([lut[c] for c in unpack(colors, cbits)], axis=-1)
+    if depth == 16:
+        samples = samples.astype(">u2")
+    scanlines = samples.view(np.uint8).reshape(colors.shape[0], -1)
+    if y0 == 0:
+        scanlines = np.vstack([np.zeros_like(scanlines[:1]), scanlines])
+
+    return deflate_rows(scanlines, _band["level"])
+
+
+def deflate_rows(scanlines: np.ndarray, level: int) -> Tuple[bytes, int, int]:
+    # scanlines[0] is the row above the first one written (zeros at the top)
+    filtered = np.empty((scanlines.shape[0] - 1, scanlines.shape[1] + 1), dtype=np.uint8)
+    filtered[:, 0] = 2
+    np.subtract(scanlines[1:], scanlines[:-1], out=filtered[:, 1:])
+    raw = filtered.tobytes()
+
+    z = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return z.compress(raw) + z.flush(zlib.Z_SYNC_FLUSH), zlib.adler32(raw), len(raw)
+
+
+def canvas_parts(colors: np.ndarray, width: int, bits: int, band_rows: int = 256, level: int = 6):
+    # Encode a finished canvas band by band for write_png_parts(), so only
+    # one band of 8-bit samples exists at a time instead of an RGB copy of
+    # the whole image (and Pillow's own 4-bytes-per-pixel copy of that)
+    cbits = channel_bits(bits)
+    lut = level_lut(cbits)
+    rows = colors.reshape(-1, width)
+    for y0 in range(0, rows.shape[0], band_rows):
+        band = rows[max(0, y0 - 1):y0 + band_rows]
+        scanlines = np.stack([lut[c] for c in unpack(band, cbits)], axis=-1).reshape(band.shape[0], -1)
+        if y0 == 0:
+            scanlines = np.vstack([np.zeros_like(scanlines[:1]), scanlines])
+        yield deflate_rows(scanlines, level)
+
+
+def write_bands(
+    path: Path,
+    bits: int,
+    order: str,
+    walk: str,
+    rng: np.random.Generator,
+    band_rows: int,
+    workers: int,
+    depth: int = 8,
+    level: int = 6,
+) -> None:
+    width, height = canvas_size(bits)
+    spec: Dict[str, object] = {
+        "width": width, "height": height, "bits": bits, "order": order, "walk": walk,
+        "depth": depth, "level": level, "table": None,
+    }
+
+    shm = None
+    if order not in INDEXED_ORDERINGS:
+        colors = ORDERINGS[order](bits, rng)
+        shm = shared_memory.SharedMemory(create=True, size=colors.nbytes)
+        np.ndarray(colors.shape, dtype=np.uint32, buffer=shm.buf)[:] = colors
+        spec["table"] = shm.name
+        del colors
+
+    rows = [(y, min(height, y + band_rows)) for y in range(0, height, band_rows)]
+    try:
+        if workers <= 1:
+            init_band_worker(spec)
+            write_png_parts(path, width, height, depth, map(encode_band, rows))
+            _band.clear()
+        else:
+            with multiprocessing.Pool(workers, initializer=init_band_worker, initargs=(spec,)) as pool:
+                write_png_parts(path, width, height, depth, pool.imap(encode_band, rows))
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+
+
+# ---------- grown placement ----------
+
+SENTINEL = 2000  # parks deleted slots far outside the colour cube
+GRID_PAD = 2  # empty cells around the grid, so small queries never clip
+EMPTY, FRONTIER, FILLED = 0, 1, 2
+
+
+class ColourIndex:
+    """
+    The unused colours, bucketed on a regular grid over the RGB cube.
+
+    Every cell keeps its colours in a fixed-size slot array. Deleting swaps
+    the last live slot into the hole and parks a sentinel far outside the
+    cube in the freed slot, so a query scans whole cells without masking.
+    """
+
+    def __init__(self, cbits: int) -> None:
+        self.cbits = cbits
+        self.shift = 2 if cbits >= 6 else 1  # ~64 colours per cell
+        self.side = 1 << (cbits - self.shift)  # cells per axis
+        self.cap = 1 << (3 * self.shift)  # colours per cell
+        self.grid = self.side + 2 * GRID_PAD
+        cells = self.grid ** 3
+
+        r, g, b = (c.astype(np.int32) for c in all_levels(3 * cbits))
+        cell = self.cell_id(r >> self.shift, g >> self.shift, b >> self.shift)
+        order = np.argsort(cell, kind="stable")
+        cell = cell[order]
+        slot = np.arange(cell.size) - np.searchsorted(cell, cell)
+        self.pool = np.full((cells, 3, self.cap), SENTINEL, dtype=np.int16)
+        self.pool[cell, :, slot] = np.stack([r, g, b], axis=1)[order]
+        self.counts = np.bincount(cell, minlength=cells).astype(np.int32)
+        self.remaining = int(cell.size)
+
+        # Cell id offsets of the 2x2x2 box towards each octant of a cell, and
+        # of the (2k+1)^3 boxes around it that fit inside the padding
+        grid = self.grid
+        self.octants = {}
+        for dirs in itertools.product((-1, 1), repeat=3):
+            d = [np.array(sorted((0, v))) for v in dirs]
+            self.octants[dirs] = ((d[0][:, None, None] * grid + d[1][None, :, None]) * grid + d[2][None, None, :]).ravel()
+        self.boxes = {}
+        for k in range(1, GRID_PAD + 1):
+            d = np.arange(-k, k + 1)
+            self.boxes[k] = ((d[:, None, None] * grid + d[None, :, None]) * grid + d[None, None, :]).ravel()
+
+    def cell_id(self, cx, cy, cz):
+        grid = self.grid
+        return ((cx + GRID_PAD) * grid + (cy + GRID_PAD)) * grid + (cz + GRID_PAD)
+
+    def box(self, lo: Sequence[int], hi: Sequence[int]) -> np.ndarray:
+        # Clipped box of cells, for queries wider than the padding
+        axes = [np.arange(max(0, a), min(self.side, b + 1)) + GRID_PAD for a, b in zip(lo, hi)]
+        grid = self.grid
+        return ((axes[0][:, None, None] * grid + axes[1][None, :, None]) * grid + axes[2][None, None, :]).ravel()
+
+    def bound(self, target: Sequence[int], lo: Sequence[int], hi: Sequence[int]) -> float:
+        # Distance from target to the nearest colour level outside the box
+        width = 1 << self.shift
+        gaps = [math.inf]
+        for t, a, b in zip(target, lo, hi):
+            if a > 0:
+                gaps.append(t - (a * width - 1))
+            if b < self.side - 1:
+                gaps.append((b + 1) * width - t)
+        return min(gaps)
+
+    def nearest(self, r: int, g: int, b: int) -> Tuple[int, int, Tuple[int, int, int]]:
+        target = (r, g, b)
+        cell = (r >> self.shift, g >> self.shift, b >> self.shift)
+        base = self.cell_id(*cell)
+
+        # Start with the 2x2x2 cells around the cell corner nearest to the
+        # target, then grow cubic boxes until nothing outside can be closer
+        half = 1 << (self.shift - 1)
+        dirs = tuple(1 if t & (2 * half - 1) >= half else -1 for t in target)
+        cells = base + self.octants[dirs]
+        lo = [min(c, c + d) for c, d in zip(cell, dirs)]
+        hi = [max(c, c + d) for c, d in zip(cell, dirs)]
+        k = 0
+        while True:
+            sub = self.pool[cells]
+            diff = sub.astype(np.int32)
+            diff -= np.array(target, dtype=np.int32)[:, None]
+            diff *= diff
+            dist = diff[:, 0]
+            dist += diff[:, 1]
+            dist += diff[:, 2]
+            j = int(dist.argmin())
+            best = dist.flat[j]
+            bound = self.bound(target, lo, hi)
+            if best <= bound * bound:
+                i, slot = divmod(j, self.cap)
+                return int(cells[i]), slot, tuple(sub[i, :, slot].tolist())
+            k += 1
+            lo = [c - k for c in cell]
+            hi = [c + k for c in cell]
+            cells = base + self.boxes[k] if k <= GRID_PAD else self.box(lo, hi)
+
+    def remove(self, cell: int, slot: int) -> None:
+        last = self.counts[cell] - 1
+        self.pool[cell, :, slot] = self.pool[cell, :, last]
+        self.pool[cell, :, last] = SENTINEL
+        self.counts[cell] = last
+        self.remaining -= 1
+
+
+class Growth:
+    """
+    Grow an allRGB image from the centre: repeatedly pick a random frontier
+    pixel (empty, next to a placed one) and give it the unused colour
+    nearest to the average of its placed neighbours.
+    """
+
+    def __init__(self, bits: int, seed: int | None = None) -> None:
+        self.bits = bits
+        self.cbits = channel_bits(bits)
+        self.width, self.height = canvas_size(bits)
+        total = self.width * self.height
+        self.index = ColourIndex(self.cbits)
+        self.red = bytearray(total)
+        self.green = bytearray(total)
+        self.blue = bytearray(total)
+        self.status = bytearray(total)
+        self.frontier: List[int] = []
+        self.placed = 0
+        self.rng = random.Random(seed)
+
+    @property
+    def done(self) -> bool:
+        return self.placed == self.width * self.height
+
+    def run(self, steps: int) -> None:
+        w, h = self.width, self.height
+        red, green, blue, status = self.red, self.green, self.blue, self.status
+        frontier = self.frontier
+        randrange = self.rng.randrange
+        nearest, remove = self.index.nearest, self.index.remove
+        interior = (-w - 1, -w, -w + 1, -1, 1, w - 1, w, w + 1)
+
+        for _ in range(min(steps, w * h - self.placed)):
+            if frontier:
+                i = randrange(len(frontier))
+                p = frontier[i]
+                last = frontier.pop()
+                if i < len(frontier):
+                    frontier[i] = last
+            else:
+                p = (h // 2) * w + w // 2
+
+            y, x = divmod(p, w)
+            if 0 < x < w - 1 and 0 < y < h - 1:
+                neighbours = [p + o for o in interior]
+            else:
+                neighbours = [
+                    ny * w + nx
+                    for ny in (y - 1, y, y + 1) if 0 <= ny < h
+                    for nx in (x - 1, x, x + 1) if 0 <= nx < w and (nx, ny) != (x, y)
+                ]
+
+            n = sr = sg = sb = 0
+            for q in neighbours:
+                if status[q] == FILLED:
+                    n += 1
+                    sr += red[q]
+                    sg += green[q]
+                    sb += blue[q]
+            if n:
+                half = n // 2
+                cell, slot, colour = nearest((sr + half) // n, (sg + half) // n, (sb + half) // n)
+            else:
+                top = (1 << self.cbits) - 1
+                cell, slot, colour = nearest(randrange(top + 1), randrange(top + 1), randrange(top + 1))
+            remove(cell, slot)
+
+            red[p], green[p], blue[p] = colour
+            status[p] = FILLED
+            for q in neighbours:
+                if status[q] == EMPTY:
+                    status[q] = FRONTIER
+                    frontier.append(q)
+            self.placed += 1
+
+    def colors(self) -> np.ndarray:
+        channels = (np.frombuffer(c, dtype=np.uint8) for c in (self.red, self.green, self.blue))
+        return pack(*channels, self.cbits)
+
+    def save(self, path: Path) -> None:
+        # Write to a temporary file first, so an interrupted save keeps the old checkpoint
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                bits=self.bits,
+                placed=self.placed,
+                red=np.frombuffer(self.red, dtype=np.uint8),
+                green=np.frombuffer(self.green, dtype=np.uint8),
+                blue=np.frombuffer(self.blue, dtype=np.uint8),
+                status=np.frombuffer(self.status, dtype=np.uint8),
+                frontier=np.array(self.frontier, dtype=np.int64),
+                pool=self.index.pool,
+                counts=self.index.counts,
+                rng=json.dumps(self.rng.getstate()),
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "Growth":
+        data = np.load(path)
+        growth = cls(int(data["bits"]))
+        growth.placed = int(data["placed"])
+        growth.red = bytearray(data["red"].tobytes())
+        growth.green = bytearray(data["green"].tobytes())
+        growth.blue = bytearray(data["blue"].tobytes())
+        growth.status = bytearray(data["status"].tobytes())
+        growth.frontier = data["frontier"].tolist()
+        growth.index.pool[...] = data["pool"]
+        growth.index.counts[...] = data["counts"]
+        growth.index.remaining = growth.width * growth.height - growth.placed
+        version, internal, gauss = json.loads(str(data["rng"]))
+        growth.rng.setstate((version, tuple(internal), gauss))
+        return growth
+
+
+def grow(bits: int, seed: int | None, checkpoint: Path | None = None, every: int = 1_000_000) -> np.ndarray:
+    if checkpoint is not None and checkpoint.exists():
+        growth = Growth.load(checkpoint)
+        if growth.bits != bits:
+            raise SystemExit(f"Checkpoint {checkpoint} is for --bits {growth.bits}, not {bits}")
+        print(f"Resuming from {checkpoint} at {growth.placed} pixels")
+    else:
+        growth = Growth(bits, seed)
+
+    total = growth.width * growth.height
+    while not growth.done:
+        growth.run(every)
+        print(f"  {growth.placed}/{total} pixels placed")
+        if checkpoint is not None and not growth.done:
+            growth.save(checkpoint)
+    return growth.colors()
+
+
+# ---------- verification ----------
+
+def neighbour_histogram(rgb: np.ndarray, above: np.ndarray | None = None) -> np.ndarray:
+    # Histogram of squared RGB distances between horizontal and vertical
+    # neighbours; squared distances are small integers, so percentiles
+    # come out exact without sorting. `above` is the row over a band.
+    hist = np.zeros(3 * 255 * 255 + 1, dtype=np.int64)
+    for axis in (0, 1):
+        block = rgb if axis == 1 or above is None else np.concatenate([above, rgb])
+        sq = None
+        for c in range(3):
+            d = np.diff(block[..., c].astype(np.int32), axis=axis)
+            d *= d
+            sq = d if sq is None else sq + d
+        hist += np.bincount(sq.ravel(), minlength=hist.size)
+    return hist
+
+
+def png_header(path: Path) -> Tuple[int, int, int, int, int]:
+    # Width, height, bit depth, colour type and interlace method from IHDR
+    with open(path, "rb") as f:
+        head = f.read(29)
+    if len(head) < 29 or head[:8] != PNG_SIGNATURE or head[12:16] != b"IHDR":
+        raise ValueError("not a PNG file")
+    return struct.unpack(">IIBBxxB", head[16:29])
+
+
+def unfilter_row(kind: int, row: np.ndarray, prev: np.ndarray, bpp: int) -> np.ndarray:
+    # Undo the PNG filter of one scanline. None, Sub and Up (what
+    # write_png_parts() uses) are vectorized; Average and Paeth go a byte
+    # at a time, which is slow but keeps other encoders' files readable.
+    if kind == 0:
+        return row
+    if kind == 1:
+        return np.cumsum(row.reshape(-1, bpp), axis=0, dtype=np.uint8).ravel()
+    if kind == 2:
+        return row + prev
+    if kind not in (3, 4):
+        raise ValueError(f"unknown PNG filter type {kind}")
+    out, up = bytearray(row.tobytes()), prev.tobytes()
+    for i in range(len(out)):
+        left = out[i - bpp] if i >= bpp else 0
+        if kind == 3:
+            out[i] = (out[i] + ((left + up[i]) >> 1)) & 0xFF
+            continue
+        upper_left = up[i - bpp] if i >= bpp else 0
+        guess = left + up[i] - upper_left
+        pa, pb, pc = abs(guess - left), abs(guess - up[i]), abs(guess - upper_left)
+        out[i] = (out[i] + (left if pa <= pb and pa <= pc else up[i] if pb <= pc else upper_left)) & 0xFF
+    return np.frombuffer(bytes(out), dtype=np.uint8)
+
+
+def png16_bands(path: Path, width: int, height: int, band_rows: int = 256):
+    # Decode a non-interlaced 16-bit RGB PNG into (rows, width, 3) bands of
+    # samples; Pillow would reduce them to 8 bits on the way in
+    stride = width * 6
+    z = zlib.decompressobj()
+    prev = np.zeros(stride, dtype=np.uint8)
+    pending = b""
+    rows: List[np.ndarray] = []
+    done = 0
+    with open(path, "rb") as f:
+        f.seek(8)
+        while True:
+            head = f.read(8)
+            if len(head) < 8:
+                break
+            length, tag = struct.unpack(">I4s", head)
+            data = f.read(length)
+            f.seek(4, os.SEEK_CUR)
+            if tag == b"IEND":
+                break
+            if tag != b"IDAT":
+                continue
+            pending += z.decompress(data)
+            offset = 0
+            while len(pending) - offset > stride and done < height:
+                line = np.frombuffer(pending, dtype=np.uint8, count=stride, offset=offset + 1)
+                prev = unfilter_row(pending[offset], line, prev, 6)
+                rows.append(prev)
+                offset += stride + 1
+                done += 1
+                if len(rows) == band_rows:
+                    yield np.stack(rows).view(">u2").reshape(-1, width, 3)
+                    rows = []
+            pending = pending[offset:]
+    if done < height:
+        raise ValueError(f"image data ends after {done} of {height} rows")
+    if rows:
+        yield np.stack(rows).view(">u2").reshape(-1, width, 3)
+
+
+def verify(path: Path, band_rows: int = 256) -> bool:
+    # Colours are counted band by band into a per-colour count that
+    # saturates at 2, so 27- and 30-bit palettes never sit in memory whole
+    path = path.expanduser()
+    try:
+        try:
+            width, height, depth, colour_type, interlace = png_header(path)
+        except ValueError:
+            depth = 8  # not a PNG; Pillow decodes it below
+        if depth < 8:
+            print(f"{path}: {depth}-bit samples cannot hold an allRGB palette")
+            return False
+        if depth == 16:
+            if colour_type != 2 or interlace:
+                print(f"{path}: 16-bit PNGs must be RGB without alpha and not interlaced")
+                return False
+            bands = png16_bands(path, width, height, band_rows)
+        else:
+            with Image.open(path) as im:
+                rgb = np.asarray(im.convert("RGB"))
+            height, width = rgb.shape[:2]
+            bands = (rgb[y:y + band_rows] for y in range(0, height, band_rows))
+    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+        print(f"{path}: cannot decode: {exc}")
+        return False
+    n = width * height
+    bits = n.bit_length() - 1
+    if n != 1 << bits or bits % 3 or sorted(canvas_size(bits)) != sorted((width, height)):
+        print(f"{path}: {width}x{height} is not an allRGB canvas size")
+        return False
+
+    cbits = channel_bits(bits)
+    inverse = np.full(1 << depth, -1, dtype=np.int32)
+    inverse[sample_lut(cbits, depth)] = np.arange(1 << cbits)
+    counts = np.zeros(n, dtype=np.uint8)
+    hist = np.zeros(3 * 255 * 255 + 1, dtype=np.int64)
+    off_palette = 0
+    above = None
+    try:
+        for band in bands:
+            levels = [inverse[band[..., c]] for c in range(3)]
+            off_palette += int(np.count_nonzero((levels[0] < 0) | (levels[1] < 0) | (levels[2] < 0)))
+            used, times = np.unique(pack(*(np.maximum(c, 0) for c in levels), cbits), return_counts=True)
+            counts[used] = np.minimum(counts[used] + times, 2)
+            # distances are always scored on the 8-bit scale
+            rgb8 = band if depth == 8 else ((band.astype(np.uint32) * 255 + 32767) // 65535).astype(np.uint8)
+            hist += neighbour_histogram(rgb8, above)
+            above = rgb8[-1:]
+    except (OSError, ValueError, zlib.error) as exc:
+        print(f"{path}: cannot decode: {exc}")
+        return False
+
+    missing = np.flatnonzero(counts == 0)
+    duplicated = np.flatnonzero(counts > 1)
+    ok = not (off_palette or missing.size or duplicated.size)
+
+    total = hist.sum()
+    dist = np.sqrt(np.arange(hist.size))
+    cumulative = np.cumsum(hist)
+
+    def percentile(q: float) -> float:
+        return float(dist[np.searchsorted(cumulative, q * total)])
+
+    print(f"{path}: {width}x{height}, {bits}-bit palette")
+    print(f"  colours: {n - missing.size} used, {missing.size} missing, {duplicated.size} duplicated, "
+          f"{off_palette} off-palette pixels [{'OK' if ok else 'FAIL'}]")
+    for label, values in (("missing", missing), ("duplicated", duplicated)):
+        if values.size:
+            sample = ", ".join(f"#{c:06x}" for c in values[:8].tolist())
+            print(f"    {label} (packed levels): {sample}{', ...' if values.size > 8 else ''}")
+    print(f"  neighbour distance: mean {float((hist * dist).sum() / total):.2f}, median {percentile(0.5):.2f}, "
+          f"p95 {percentile(0.95):.2f}, p99 {percentile(0.99):.2f}, max {float(dist[np.flatnonzero(hist)[-1]]):.2f}")
+    return ok
+
+
+def build_argparser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="Generate an image that uses every colour of a palette exactly once.")
+    p.add_argument("--out", type=Path, default=Path("shuffled_colors.png"), help="Output PNG path.")
+    p.add_argument("--seed", type=int, default=None, help="Random seed (default: fresh entropy).")
+    p.add_argument("--order", choices=sorted(ORDERINGS) + ["grow"], default="shuffle",
+                   help="Order in which colours are laid down; 'grow' grows the image from the centre instead.")
+    p.add_argument("--walk", choices=sorted(WALKS), default="raster",
+                   help="Order in which pixels are visited (a walk makes no visible difference to --order shuffle).")
+    p.add_argument("--bits", type=int, choices=(12, 15, 18, 21, 24, 27, 30), default=BITS,
+                   help="Palette size in bits, e.g. 15 = 256x128, 18 = 512x512, 24 = 4096x4096. "
+                        "More than 24 needs --bands.")
+    p.add_argument("--bands", type=int, default=0,
+                   help="Stream the PNG in bands of this many rows, computed in a process pool.")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes for --bands.")
+    p.add_argument("--depth", type=int, choices=(8, 16), default=None,
+                   help="Bits per PNG sample with --bands (default: 8, or 16 above 24-bit palettes).")
+    p.add_argument("--photo", type=Path, default=None,
+                   help="Remap this photo so it uses every colour once (overrides --order/--walk).")
+    p.add_argument("--refine", type=int, default=0, help="Rounds of batch pair swaps after --photo matching.")
+    p.add_argument("--verify", type=Path, nargs="+", default=None, metavar="PNG",
+                   help="Check that images use every colour exactly once and report smoothness; generates nothing.")
+    p.add_argument("--checkpoint", type=Path, default=None,
+                   help="With --order grow: save progress here and resume from it when it exists.")
+    p.add_argument("--checkpoint-every", type=int, default=1_000_000, help="Pixels grown between checkpoints.")
+    return p
+
+
+def main() -> int:
+    args = build_argparser().parse_args()
+    if args.verify:
+        results = [verify(path) for path in args.verify]
+        return 0 if all(results) else 1
+
+    rng = np.random.default_rng(args.seed)
+
+    width, height = canvas_size(args.bits)
+    out_path = args.out.expanduser()
+    out_path.parent.mkdir(parents=True, exist_ok=True)
 
-# Create a list of all possible colors
-colors = [(red, green, blue) for red in range(0, 256) for green in range(0, 256) for blue in range(0, 256)]
+    if args.bands:
+        if args.photo is not None:
+            raise SystemExit("--photo cannot be computed in independent bands")
+        if args.order == "grow":
+            raise SystemExit("--order grow cannot be computed in independent bands")
+        depth = args.depth or (8 if args.bits <= 24 else 16)
+        if args.bits > 24 and depth == 8:
+            raise SystemExit("Palettes above 24 bits need --depth 16")
+        write_bands(out_path, args.bits, args.order, args.walk, rng, args.bands, args.workers, depth)
+        print(f"Wrote {out_path}")
+        return 0
+    if args.bits > 24:
+        raise SystemExit("Palettes above 24 bits need --bands")
 
-# Shuffle the colors using a random number generator
-random.shuffle(colors)
+    if args.photo is not None:
+        colors = photo_colors(args.photo, args.bits, rng, args.refine)
+    elif args.order == "grow":
+        colors = grow(args.bits, args.seed, args.checkpoint, args.checkpoint_every)
+    else:
+        colors = ORDERINGS[args.order](args.bits, rng)
+        if args.walk != "raster":  # the raster walk places colours as they are
+            colors = render(colors, WALKS[args.walk](width, height))
+    write_png_parts(out_path, width, height, 8, canvas_parts(colors, width, args.bits))
+    print(f"Wrote {out_path}")
+    return 0
 
-# Iterate over all pixels in the image and assign each pixel a randomly shuffled color
-for x in range(0, width):
-  for y in range(0, height):
-    image.putpixel((x, y), colors[x * width + y])
 
-# Save the image to a file
-image.save("shuffled_colors.png")
+if __name__ == "__main__":
+    raise SystemExit(main())
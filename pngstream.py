@@ -0,0 +1,120 @@
+"""
+Streaming PNG writers shared by the image scripts in this repository
+(screenshots/so.py, utterlyrandom/story-generator.py, ai/allrgb.py).
+
+Rows and animation frames are written as they are produced, so a script
+never has to hold the whole raster (or Pillow's copy of it) just to save
+it. Only the standard library is needed; the scripts put the repository
+root on sys.path to import this module.
+"""
+
+from __future__ import annotations
+
+import struct
+import zlib
+from typing import BinaryIO, Iterable, Tuple
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def write_chunk(f: BinaryIO, tag: bytes, data: bytes) -> None:
+    f.write(struct.pack(">I", len(data)) + tag + data)
+    f.write(struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF))
+
+
+def ihdr(width: int, height: int, depth: int = 8) -> bytes:
+    # truecolour (RGB) without alpha, deflate, adaptive filtering, no interlace
+    return struct.pack(">IIBBBBB", width, height, depth, 2, 0, 0, 0)
+
+
+def scanlines(raw: bytes, stride: int) -> bytes:
+    # filter type 0 (None) in front of every row
+    return b"".join(b"\x00" + raw[i:i + stride] for i in range(0, len(raw), stride))
+
+
+def write_png_rows(path, width: int, height: int, bands: Iterable[bytes], depth: int = 8, level: int = 6) -> None:
+    """
+    Write an RGB PNG from `bands` of whole raw rows (big-endian samples at
+    depth 16), deflated as one stream, so only one band is ever in memory.
+    """
+    stride = width * 3 * depth // 8
+    rows = 0
+    with open(path, "wb") as f:
+        f.write(PNG_SIGNATURE)
+        write_chunk(f, b"IHDR", ihdr(width, height, depth))
+        z = zlib.compressobj(level)
+        for raw in bands:
+            rows += len(raw) // stride
+            out = z.compress(scanlines(raw, stride))
+            if out:
+                write_chunk(f, b"IDAT", out)
+        write_chunk(f, b"IDAT", z.flush())
+        write_chunk(f, b"IEND", b"")
+    if rows != height:
+        raise ValueError(f"Expected {height} rows, wrote {rows}")
+
+
+def adler32_combine(adler1: int, adler2: int, len2: int) -> int:
+    # zlib's adler32_combine(): checksum of A + B from those of A and B
+    base = 65521
+    rem = len2 % base
+    sum1 = adler1 & 0xFFFF
+    sum2 = (rem * sum1) % base
+    sum1 += (adler2 & 0xFFFF) + base - 1
+    sum2 += ((adler1 >> 16) & 0xFFFF) + ((adler2 >> 16) & 0xFFFF) + base - rem
+    sum1 %= base
+    sum2 %= base
+    return sum1 | (sum2 << 16)
+
+
+def write_png_parts(path, width: int, height: int, depth: int, parts: Iterable[Tuple[bytes, int, int]]) -> None:
+    """
+    Write an RGB PNG from independently deflated parts, e.g. bands encoded
+    in parallel. Each part is (raw deflate data ending in a sync flush,
+    adler32 of its filtered rows, length of those rows). The parts are
+    concatenated into one zlib stream: header, the parts' non-final blocks,
+    an empty final block and the combined checksum. Each part is written as
+    soon as it arrives.
+    """
+    adler = 1
+    with open(path, "wb") as f:
+        f.write(PNG_SIGNATURE)
+        write_chunk(f, b"IHDR", ihdr(width, height, depth))
+        write_chunk(f, b"IDAT", b"\x78\x9c")
+        for payload, part_adler, length in parts:
+            adler = adler32_combine(adler, part_adler, length)
+            if payload:
+                write_chunk(f, b"IDAT", payload)
+        write_chunk(f, b"IDAT", b"\x03\x00" + struct.pack(">I", adler))
+        write_chunk(f, b"IEND", b"")
+
+
+def write_apng(path, width: int, height: int, count: int, frames: Iterable[Tuple[int, int, int, int, bytes, int]], loops: int = 0) -> None:
+    """
+    Write an 8-bit RGB animated PNG of `count` frames, each (x, y, width,
+    height, zlib stream of its filtered rows as in IDAT, delay in ms). The
+    first frame must cover the canvas; it doubles as the still image for
+    viewers without APNG support. Every later frame is stored as just its
+    sub-rectangle, drawn over the previous one (dispose none, blend source),
+    so frames are written as they are produced and only one is ever held.
+    """
+    seq = 0
+    written = 0
+    with open(path, "wb") as f:
+        f.write(PNG_SIGNATURE)
+        write_chunk(f, b"IHDR", ihdr(width, height))
+        write_chunk(f, b"acTL", struct.pack(">II", count, loops))
+        for x, y, w, h, data, delay in frames:
+            if written == 0 and (x, y, w, h) != (0, 0, width, height):
+                raise ValueError("The first APNG frame must cover the whole canvas")
+            write_chunk(f, b"fcTL", struct.pack(">IIIIIHHBB", seq, w, h, x, y, min(delay, 0xFFFF), 1000, 0, 0))
+            seq += 1
+            if written == 0:
+                write_chunk(f, b"IDAT", data)
+            else:
+                write_chunk(f, b"fdAT", struct.pack(">I", seq) + data)
+                seq += 1
+            written += 1
+        write_chunk(f, b"IEND", b"")
+    if written != count:
+        raise ValueError(f"Expected {count} frames, wrote {written}")
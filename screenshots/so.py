@@ -1,5 +1,11 @@
 
+import base64
+import io
+import json
+import math
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from subprocess import Popen, PIPE
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
@@ -8,6 +14,10 @@
 abspath = lambda *p: os.path.abspath(os.path.join(*p))
 ROOT = abspath(os.path.dirname(__file__))
 
+# the streaming PNG writer lives at the repository root, shared with the other image scripts
+sys.path.insert(0, abspath(ROOT, os.pardir))
+from pngstream import write_png_rows  # noqa: E402
+
 
 def execute_command(command):
     result = Popen(command, shell=True, stdout=PIPE).stdout.read()
@@ -33,6 +43,54 @@ def do_screen_capturing(url, screen_path, width, height):
     driver.quit()
 
 
+def do_full_page_capturing(url, screen_path, width, height, scale=1.0, tile_height=2048):
+    print("Capturing full page..")
+    from PIL import Image
+    service = Service()
+    options = webdriver.ChromeOptions()
+    driver = webdriver.Chrome(service=service, options=options)
+    driver.set_page_load_timeout(30)
+    if width and height:
+        driver.set_window_size(width, height)
+    driver.get(url)
+    try:
+        metrics = driver.execute_cdp_cmd('Page.getLayoutMetrics', {})
+        content = metrics.get('cssContentSize') or metrics['contentSize']
+        page_width = int(math.ceil(content['width']))
+        page_height = int(math.ceil(content['height']))
+        out_width = max(1, int(round(page_width * scale)))
+        out_height = max(1, int(round(page_height * scale)))
+
+        def tiles():
+            # walk the page top to bottom; Chrome renders each clip at the
+            # requested scale, so a downscaled capture never exists full size
+            y = 0
+            while y < page_height:
+                clip_height = min(tile_height, page_height - y)
+                top = int(round(y * scale))
+                bottom = out_height if y + clip_height >= page_height else int(round((y + clip_height) * scale))
+                size = (out_width, bottom - top)
+                if size[1] <= 0:
+                    # at small scales a short last tile can round down to no rows
+                    y += clip_height
+                    continue
+                shot = driver.execute_cdp_cmd('Page.captureScreenshot', {
+                    'format': 'png',
+                    'captureBeyondViewport': True,
+                    'clip': {'x': 0, 'y': y, 'width': page_width, 'height': clip_height, 'scale': scale},
+                })
+                tile = Image.open(io.BytesIO(base64.b64decode(shot['data']))).convert('RGB')
+                if tile.size != size:
+                    # devicePixelRatio != 1 or rounding at the tile edges
+                    tile = tile.resize(size, Image.LANCZOS)
+                yield tile
+                y += clip_height
+
+        write_png_rows(screen_path, out_width, out_height, (tile.tobytes() for tile in tiles()))
+    finally:
+        driver.quit()
+
+
 def do_crop(params):
     print("Cropping captured image..")
     command = [
@@ -56,12 +114,88 @@ def do_thumbnail(params):
     execute_command(' '.join(command))
 
 
+def fit_size(size, box_width):
+    # keep the aspect ratio of the capture, like `-thumbnail Wx`
+    width, height = size
+    return box_width, max(1, int(round(height * box_width / float(width))))
+
+
+def fit_box(size, box_width, box_height):
+    # largest size with the capture's aspect ratio inside the box, like `-thumbnail WxH`
+    width, height = size
+    ratio = min(box_width / float(width), box_height / float(height))
+    return max(1, int(round(width * ratio))), max(1, int(round(height * ratio)))
+
+
+def reduce_then_lanczos(image, size):
+    # integer box reduction while the source is still at least twice the
+    # target, then a single Lanczos pass for the remaining fraction
+    from PIL import Image
+    factor = min(image.width // (size[0] * 2), image.height // (size[1] * 2))
+    if factor > 1:
+        image = image.reduce(factor)
+    return image.resize(size, Image.LANCZOS)
+
+
+def save_image(image, path):
+    image.save(path)
+    return os.path.getsize(path)
+
+
+def do_thumbnail_pyramid(params):
+    print("Generating thumbnail pyramid from cropped captured image..")
+    # Pillow is only needed here and for full page captures, so import it lazily
+    from PIL import Image
+    source = Image.open(params['crop_path'])
+    source.load()  # decode the capture once, every level derives from it
+    if source.mode not in ('RGB', 'RGBA'):
+        source = source.convert('RGB')
+
+    # largest first, so every level is built from the previous (bigger) one
+    widths = sorted(set(int(w) for w in params['sizes']), reverse=True)
+    # upscaled levels would only add bytes, so widths beyond the capture are left out
+    skipped = [w for w in widths if w > source.width]
+    widths = [w for w in widths if w <= source.width]
+    levels = []
+    current = source
+    for width in widths:
+        size = fit_size(source.size, width)
+        if size != current.size:
+            current = reduce_then_lanczos(current, size)
+        levels.append((size, abspath(params['path'], 'thumbnail_%sw_%s' % (width, params['filename'])), current))
+
+    # the regular width x height thumbnail, written where do_thumbnail would put it
+    size = fit_box(source.size, params['width'], params['height'])
+    thumbnail = reduce_then_lanczos(source, size) if size != source.size else source
+    levels.append((size, params['thumbnail_path'], thumbnail))
+
+    with ThreadPoolExecutor() as pool:
+        sizes = list(pool.map(lambda level: save_image(level[2], level[1]), levels))
+
+    entries = [
+        {'width': size[0], 'height': size[1], 'path': path, 'bytes': nbytes}
+        for (size, path, _), nbytes in zip(levels, sizes)
+    ]
+    manifest = {
+        'source': params['crop_path'],
+        'sizes': entries[:-1],
+        'skipped': [{'width': w, 'reason': 'wider than the capture (%spx)' % source.width} for w in skipped],
+        'thumbnail': entries[-1],
+    }
+    with open(params['manifest_path'], 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
 def get_screen_shot(**kwargs):
     url = kwargs['url']
     width = int(kwargs.get('width', 1024)) # screen width to capture
     height = int(kwargs.get('height', 768)) # screen height to capture
     filename = kwargs.get('filename', 'screen.png') # file name e.g. screen.png
     path = kwargs.get('path', ROOT) # directory path to store screen
+    full_page = kwargs.get('full_page', False) # capture the whole page through CDP instead of the window
+    full_page_scale = float(kwargs.get('full_page_scale', 1.0)) # output scale of a full page capture
+    tile_height = int(kwargs.get('tile_height', 2048)) # css pixels captured per full page tile
 
     crop = kwargs.get('crop', False) # crop the captured screen
     crop_width = int(kwargs.get('crop_width', width)) # the width of crop screen
@@ -72,6 +206,7 @@ def get_screen_shot(**kwargs):
     thumbnail_width = int(kwargs.get('thumbnail_width', width)) # the width of thumbnail
     thumbnail_height = int(kwargs.get('thumbnail_height', height)) # the height of thumbnail
     thumbnail_replace = kwargs.get('thumbnail_replace', False) # does thumbnail image replace crop image?
+    thumbnail_sizes = kwargs.get('thumbnail_sizes', None) # widths for a srcset pyramid, e.g. (1920, 1280, 640, 320, 200)
 
     screen_path = abspath(path, filename)
     crop_path = thumbnail_path = screen_path
@@ -79,7 +214,10 @@ def get_screen_shot(**kwargs):
     if thumbnail and not crop:
         raise Exception('Thumnail generation requires crop image, set crop=True')
 
-    do_screen_capturing(url, screen_path, width, height)
+    if full_page:
+        do_full_page_capturing(url, screen_path, width, height, scale=full_page_scale, tile_height=tile_height)
+    else:
+        do_screen_capturing(url, screen_path, width, height)
 
     if crop:
         if not crop_replace:
@@ -95,7 +233,14 @@ def get_screen_shot(**kwargs):
             params = {
                 'width': thumbnail_width, 'height': thumbnail_height,
                 'thumbnail_path': thumbnail_path, 'crop_path': crop_path}
-            do_thumbnail(params)
+            if thumbnail_sizes:
+                # the srcset levels are listed in thumbnail_<name>.json next to the thumbnail
+                params.update({
+                    'sizes': thumbnail_sizes, 'path': path, 'filename': filename,
+                    'manifest_path': abspath(path, 'thumbnail_' + os.path.splitext(filename)[0] + '.json')})
+                do_thumbnail_pyramid(params)
+            else:
+                do_thumbnail(params)
     return screen_path, crop_path, thumbnail_path
 
 
@@ -105,6 +250,7 @@ def get_screen_shot(**kwargs):
         Install NodeJS
         install selenium (in your virtualenv, if you are using that)
         install imageMagick
+        install pillow (only for thumbnail_sizes pyramids and full_page captures)
     '''
 
     url = 'https://galeriehelder.nl/'
@@ -2,12 +2,20 @@
 from __future__ import annotations
 
 import argparse
+import glob
 import io
-from collections import deque
-from dataclasses import dataclass
+import itertools
+import json
+import os
+import re
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import List, Sequence, Tuple
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 from urllib.parse import urlparse
 
 import numpy as np
@@ -48,20 +56,32 @@ def is_url(value: str) -> bool:
     return parsed.scheme in {"http", "https"} and bool(parsed.netloc)
 
 
-def load_image(source: str) -> Image.Image:
+def load_image(source: str, mode: Optional[str] = "RGB") -> Image.Image:
     if is_url(source):
         if requests is None:
             raise SystemExit(
                 "This script needs the 'requests' package for image URLs. Install it with: pip install requests"
             )
-        response = requests.get(source, timeout=30)
-        response.raise_for_status()
-        return Image.open(io.BytesIO(response.content)).convert("RGB")
+        return open_image(fetch_bytes(requests, source), mode)
 
     path = Path(source).expanduser().resolve()
     if not path.exists():
         raise SystemExit(f"Image file not found: {path}")
-    return Image.open(path).convert("RGB")
+    image = Image.open(path)
+    return image.convert(mode) if mode else image
+
+
+def fetch_bytes(session, url: str) -> bytes:
+    # session is a requests.Session, or the requests module itself for a one-off get
+    response = session.get(url, timeout=30)
+    response.raise_for_status()
+    return response.content
+
+
+def open_image(data: bytes, mode: Optional[str] = "RGB") -> Image.Image:
+    # mode=None leaves the page in its stored mode, skipping a full-size converted copy
+    image = Image.open(io.BytesIO(data))
+    return image.convert(mode) if mode else image
 
 
 def to_dark_mask(image: Image.Image, threshold: int) -> np.ndarray:
@@ -80,88 +100,140 @@ def bridge_small_gaps(mask: np.ndarray, max_gap: int) -> np.ndarray:
     if max_gap <= 0:
         return mask
 
-    out = mask.copy()
-    h, w = out.shape
-
-    # Fill short vertical gaps.
-    for x in range(w):
-        y = 0
-        while y < h:
-            if out[y, x]:
-                y += 1
-                continue
-            start = y
-            while y < h and not out[y, x]:
-                y += 1
-            end = y
-            gap = end - start
-            if gap <= max_gap and start > 0 and end < h and out[start - 1, x] and out[end, x]:
-                out[start:end, x] = True
-
-    # Fill short horizontal gaps.
-    for y in range(h):
-        x = 0
-        while x < w:
-            if out[y, x]:
-                x += 1
-                continue
-            start = x
-            while x < w and not out[y, x]:
-                x += 1
-            end = x
-            gap = end - start
-            if gap <= max_gap and start > 0 and end < w and out[y, start - 1] and out[y, end]:
-                out[y, start:end] = True
+    # Vertical gaps first, then horizontal gaps on the result.
+    out = fill_column_gaps(mask, max_gap)
+    return fill_column_gaps(out.T, max_gap).T
 
-    return out
+
+def fill_column_gaps(mask: np.ndarray, max_gap: int) -> np.ndarray:
+    """
+    Fill every vertical run of light pixels up to max_gap long that has dark
+    pixels directly above and below it. A light pixel lies in such a run
+    exactly when there is dark a rows above and b rows below with
+    a + b <= max_gap + 1, so the test is a handful of shifted ANDs.
+    """
+    h = mask.shape[0]
+    fill = np.zeros_like(mask)
+    below = np.zeros_like(mask)
+    for k in range(1, max_gap + 1):
+        a = max_gap + 1 - k
+        if k < h:
+            below[: h - k] |= mask[k:]
+        if a < h:
+            fill[a:] |= mask[: h - a] & below[a:]
+    return mask | fill
+
+
+def mask_runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Row, first and last column of every horizontal run of dark pixels, in raster order."""
+    h, w = mask.shape
+    # a blank column after each row keeps runs from wrapping onto the next one
+    flat = np.zeros((h, w + 1), dtype=bool)
+    flat[:, :w] = mask
+    flat = flat.ravel()
+    edges = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    if flat[0]:
+        edges = np.concatenate(([0], edges))
+    starts, stops = edges[0::2], edges[1::2]
+    rows = starts // (w + 1)
+    return rows, starts - rows * (w + 1), stops - 1 - rows * (w + 1)
+
+
+def touching_runs(rows: np.ndarray, starts: np.ndarray, ends: np.ndarray, width: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pairs (upper, lower) of runs on consecutive rows that share a column, i.e.
+    are 4-connected. The runs of a row are sorted and disjoint, so the runs of
+    the row above that overlap a given run form one contiguous index range.
+    """
+    stride = width + 2
+    end_keys = rows * stride + ends
+    start_keys = rows * stride + starts
+    lo = np.searchsorted(end_keys, (rows - 1) * stride + starts, side="left")
+    hi = np.searchsorted(start_keys, (rows - 1) * stride + ends, side="right")
+    counts = np.maximum(hi - lo, 0)
+    total = int(counts.sum())
+    lower = np.repeat(np.arange(len(rows)), counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    upper = np.repeat(lo, counts) + offsets
+    return upper, lower
+
+
+def union_runs(count: int, upper: np.ndarray, lower: np.ndarray) -> np.ndarray:
+    """
+    Label runs by union-find over the touching pairs, array-wide: hook the
+    larger root of every unmerged pair onto the smaller, then compress paths
+    by pointer jumping until each run points at its root. Every component
+    ends up rooted at its lowest run index.
+    """
+    parent = np.arange(count)
+    while len(upper):
+        ru, rl = parent[upper], parent[lower]
+        open_ = ru != rl
+        if not open_.any():
+            break
+        upper, lower, ru, rl = upper[open_], lower[open_], ru[open_], rl[open_]
+        np.minimum.at(parent, np.maximum(ru, rl), np.minimum(ru, rl))
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+    return parent
+
+
+def label_runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Runs of the mask (see mask_runs) and the root run of each one's 4-connected component."""
+    rows, starts, ends = mask_runs(mask)
+    roots = union_runs(len(rows), *touching_runs(rows, starts, ends, mask.shape[1]))
+    return rows, starts, ends, roots
+
+
+def run_boxes(
+    rows: np.ndarray, starts: np.ndarray, ends: np.ndarray, roots: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Root run, x0, y0, x1, y1 of every component, in raster order of its first pixel."""
+    x0 = starts.copy()
+    x1 = ends.copy()
+    y1 = rows.copy()
+    np.minimum.at(x0, roots, starts)
+    np.maximum.at(x1, roots, ends)
+    np.maximum.at(y1, roots, rows)
+
+    # a component's root is its first run, so roots in index order are in
+    # raster order of each component's first pixel, and that run's row is the top
+    first = np.flatnonzero(roots == np.arange(len(rows)))
+    return first, x0[first], rows[first], x1[first], y1[first]
 
 
 def connected_components(mask: np.ndarray) -> List[Rect]:
-    h, w = mask.shape
-    visited = np.zeros((h, w), dtype=bool)
-    rects: List[Rect] = []
+    """
+    Bounding boxes of the 4-connected dark components, in raster order of
+    each component's first pixel. Works on horizontal runs rather than
+    pixels, so the cost follows the amount of ink edges, not the page area.
+    """
+    _, x0, y0, x1, y1 = run_boxes(*label_runs(mask))
+    return [Rect(int(a), int(b), int(c), int(d)) for a, b, c, d in zip(x0, y0, x1, y1)]
 
-    ys, xs = np.nonzero(mask)
-    for sy, sx in zip(ys.tolist(), xs.tolist()):
-        if visited[sy, sx]:
-            continue
 
-        q = deque([(sy, sx)])
-        visited[sy, sx] = True
-        min_x = max_x = sx
-        min_y = max_y = sy
-
-        while q:
-            y, x = q.popleft()
-            if x < min_x:
-                min_x = x
-            if x > max_x:
-                max_x = x
-            if y < min_y:
-                min_y = y
-            if y > max_y:
-                max_y = y
-
-            ny = y - 1
-            if ny >= 0 and mask[ny, x] and not visited[ny, x]:
-                visited[ny, x] = True
-                q.append((ny, x))
-            ny = y + 1
-            if ny < h and mask[ny, x] and not visited[ny, x]:
-                visited[ny, x] = True
-                q.append((ny, x))
-            nx = x - 1
-            if nx >= 0 and mask[y, nx] and not visited[y, nx]:
-                visited[y, nx] = True
-                q.append((y, nx))
-            nx = x + 1
-            if nx < w and mask[y, nx] and not visited[y, nx]:
-                visited[y, nx] = True
-                q.append((y, nx))
-
-        rects.append(Rect(min_x, min_y, max_x, max_y))
-
-    return rects
+def pool_mask(mask: np.ndarray, factor: int) -> np.ndarray:
+    """Shrink the mask by factor, marking a block dark when any pixel in it is dark."""
+    h, w = mask.shape
+    bh, bw = -(-h // factor), -(-w // factor)
+    if (bh * factor, bw * factor) != (h, w):
+        padded = np.zeros((bh * factor, bw * factor), dtype=bool)
+        padded[:h, :w] = mask
+        mask = padded
+    # rows of blocks first, while the reduced axis is still a contiguous stride
+    rows = mask.reshape(bh, factor, bw * factor).any(axis=1)
+    return rows.reshape(bh, bw, factor).any(axis=2)
+
+
+def paint_runs(shape: Tuple[int, int], rows: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    out = np.zeros(shape, dtype=bool)
+    lengths = ends - starts + 1
+    offsets = np.arange(int(lengths.sum())) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    out.ravel()[np.repeat(rows * shape[1] + starts, lengths) + offsets] = True
+    return out
 
 
 def edge_has_line(section: np.ndarray, axis: int, min_coverage: float) -> bool:
@@ -200,21 +272,93 @@ def looks_like_bordered_rectangle(mask: np.ndarray, rect: Rect, border_band: int
     return True
 
 
+def integral_image(mask: np.ndarray) -> np.ndarray:
+    """Summed-area table with a zero first row and column: sums[y, x] counts the dark pixels of mask[:y, :x]."""
+    h, w = mask.shape
+    sums = np.zeros((h + 1, w + 1), dtype=np.int32 if mask.size < 2**31 else np.int64)
+    np.cumsum(mask, axis=1, dtype=sums.dtype, out=sums[1:, 1:])
+    np.cumsum(sums[1:, 1:], axis=0, out=sums[1:, 1:])
+    return sums
+
+
+def bordered_by_sums(sums: np.ndarray, rects: Sequence[Rect], border_band: int, min_coverage: float) -> np.ndarray:
+    """
+    looks_like_bordered_rectangle for many rects at once from a summed-area
+    table: each band row or column is one box sum and the interior another,
+    so the cost is O(border_band) array operations for the whole batch.
+    """
+    band = max(1, border_band)
+    x0, y0, x1, y1 = (np.array([getattr(r, k) for r in rects], dtype=np.int64) for k in ("x0", "y0", "x1", "y1"))
+    widths = x1 - x0 + 1
+    heights = y1 - y0 + 1
+    last_y, last_x = sums.shape[0] - 2, sums.shape[1] - 2
+
+    def box(bx0, by0, bx1, by1):
+        # rects too small for their bands are rejected below; clip so their lookups stay in range
+        bx0, bx1 = np.clip(bx0, 0, last_x), np.clip(bx1, 0, last_x)
+        by0, by1 = np.clip(by0, 0, last_y), np.clip(by1, 0, last_y)
+        return sums[by1 + 1, bx1 + 1] - sums[by0, bx1 + 1] - sums[by1 + 1, bx0] + sums[by0, bx0]
+
+    top = bottom = left = right = np.zeros(len(rects), dtype=bool)
+    for i in range(band):
+        top = top | (box(x0, y0 + i, x1, y0 + i) / widths >= min_coverage)
+        bottom = bottom | (box(x0, y1 - band + 1 + i, x1, y1 - band + 1 + i) / widths >= min_coverage)
+        left = left | (box(x0 + i, y0, x0 + i, y1) / heights >= min_coverage)
+        right = right | (box(x1 - band + 1 + i, y0, x1 - band + 1 + i, y1) / heights >= min_coverage)
+    ok = (heights >= band * 2) & (widths >= band * 2) & top & bottom & left & right
+
+    has_inner = (heights > band * 2) & (widths > band * 2)
+    inner_area = np.where(has_inner, (heights - 2 * band) * (widths - 2 * band), 1)
+    inner_density = box(x0 + band, y0 + band, x1 - band, y1 - band) / inner_area
+    return ok & ~(has_inner & (inner_density > 0.35))
+
+
+# Rough costs measured on a 4000x6000 page, in units of one pixel read by
+# looks_like_bordered_rectangle: each call has a fixed overhead of about
+# 110k pixels, and building the summed-area table costs about 25 per page pixel.
+RECT_OVERHEAD_PX = 110_000
+SUMS_COST_PER_PX = 25
+
+
+def looks_like_bordered_rectangles(mask: np.ndarray, rects: Sequence[Rect], border_band: int, min_coverage: float) -> List[bool]:
+    """looks_like_bordered_rectangle for each rect, from one summed-area table when there are enough rects to pay for it."""
+    direct_cost = sum(r.area for r in rects) + RECT_OVERHEAD_PX * len(rects)
+    if direct_cost <= SUMS_COST_PER_PX * mask.size:
+        return [looks_like_bordered_rectangle(mask, r, border_band=border_band, min_coverage=min_coverage) for r in rects]
+    return bordered_by_sums(integral_image(mask), rects, border_band, min_coverage).tolist()
+
+
+def is_nested(rect: Rect, other: Rect, tolerance: int) -> bool:
+    return (
+        rect.x0 >= other.x0 - tolerance
+        and rect.y0 >= other.y0 - tolerance
+        and rect.x1 <= other.x1 + tolerance
+        and rect.y1 <= other.y1 + tolerance
+    )
+
+
 def dedupe_nested(rects: Sequence[Rect], tolerance: int = 2) -> List[Rect]:
+    """
+    Drop every rect nested (within tolerance) in a larger rect that is kept.
+
+    Kept rects are filed in a grid under each cell their grown extent
+    touches. A rect nested in one lies inside that extent, corner included,
+    so only the rects filed under its top-left corner's cell need checking.
+    """
+    if not rects:
+        return []
+    # cells about the size of a typical rect keep both the filing and the lookups short
+    size = max(1, sorted(max(r.width, r.height) for r in rects)[len(rects) // 2])
+    grid: Dict[Tuple[int, int], List[Rect]] = {}
+
     kept: List[Rect] = []
     for rect in sorted(rects, key=lambda r: r.area, reverse=True):
-        is_nested = False
-        for other in kept:
-            if (
-                rect.x0 >= other.x0 - tolerance
-                and rect.y0 >= other.y0 - tolerance
-                and rect.x1 <= other.x1 + tolerance
-                and rect.y1 <= other.y1 + tolerance
-            ):
-                is_nested = True
-                break
-        if not is_nested:
-            kept.append(rect)
+        if any(is_nested(rect, other, tolerance) for other in grid.get((rect.x0 // size, rect.y0 // size), ())):
+            continue
+        kept.append(rect)
+        for gy in range((rect.y0 - tolerance) // size, (rect.y1 + tolerance) // size + 1):
+            for gx in range((rect.x0 - tolerance) // size, (rect.x1 + tolerance) // size + 1):
+                grid.setdefault((gx, gy), []).append(rect)
     return kept
 
 
@@ -229,19 +373,22 @@ def sort_reading_order(rects: Sequence[Rect]) -> List[Rect]:
     rects_sorted = sorted(rects, key=lambda r: (r.center[1], r.center[0]))
     rows: List[List[Rect]] = []
     row_ys: List[float] = []
+    row_sum = 0.0
 
+    # Rects arrive by centre y and a row's mean never lies below its rects, so
+    # a row too far above one rect is too far above every later one. Only the
+    # newest row can still take a rect; every older row was already out of
+    # reach when the newest one was started.
     for rect in rects_sorted:
         cy = rect.center[1]
-        placed = False
-        for i, row_y in enumerate(row_ys):
-            if abs(cy - row_y) <= row_tol:
-                rows[i].append(rect)
-                row_ys[i] = sum(r.center[1] for r in rows[i]) / len(rows[i])
-                placed = True
-                break
-        if not placed:
+        if rows and abs(cy - row_ys[-1]) <= row_tol:
+            rows[-1].append(rect)
+            row_sum += cy
+            row_ys[-1] = row_sum / len(rows[-1])
+        else:
             rows.append([rect])
             row_ys.append(cy)
+            row_sum = cy
 
     ordered: List[Rect] = []
     for row in [r for _, r in sorted(zip(row_ys, rows), key=lambda t: t[0])]:
@@ -249,6 +396,75 @@ def sort_reading_order(rects: Sequence[Rect]) -> List[Rect]:
     return ordered
 
 
+def pyramid_candidates(
+    mask: np.ndarray,
+    factor: int,
+    min_width: int,
+    min_height: int,
+    border_band: int,
+    line_coverage: float,
+    bridge_gap: int,
+) -> List[Rect]:
+    """
+    The bordered rectangles detect_frames would find on the whole bridged
+    mask, with the full-resolution work limited to the page regions that can
+    hold them.
+
+    Every dark component of the bridged mask lies inside one component of
+    the block-pooled mask, as long as a block is longer than a bridged gap.
+    Coarse components whose footprint is smaller than a frame are skipped
+    outright; the rest are bridged, labelled and validated at full
+    resolution inside their own footprint only.
+    """
+    h, w = mask.shape
+    f = max(factor, bridge_gap + 1)
+    coarse = pool_mask(mask, f)
+    rows, starts, ends, roots = label_runs(coarse)
+    first, bx0, by0, bx1, by1 = run_boxes(rows, starts, ends, roots)
+
+    big = np.flatnonzero(
+        (np.minimum((bx1 + 1) * f, w) - bx0 * f >= min_width)
+        & (np.minimum((by1 + 1) * f, h) - by0 * f >= min_height)
+    )
+    found: List[Tuple[Tuple[int, int], Rect]] = []
+    for k in big:
+        x0, y0 = int(bx0[k]) * f, int(by0[k]) * f
+        x1, y1 = min((int(bx1[k]) + 1) * f, w), min((int(by1[k]) + 1) * f, h)
+
+        # bridging looks bridge_gap pixels along each axis, so that much context is enough
+        px0, py0 = max(x0 - bridge_gap, 0), max(y0 - bridge_gap, 0)
+        px1, py1 = min(x1 + bridge_gap, w), min(y1 + bridge_gap, h)
+        bridged = bridge_small_gaps(mask[py0:py1, px0:px1], bridge_gap)
+        bridged = bridged[y0 - py0:y1 - py0, x0 - px0:x1 - px0]
+
+        # another large component reaching into this footprint would show up clipped; keep only our blocks
+        labelled = bridged
+        overlaps = (bx0[big] <= bx1[k]) & (bx1[big] >= bx0[k]) & (by0[big] <= by1[k]) & (by1[big] >= by0[k])
+        if overlaps.sum() > 1:
+            own = roots == first[k]
+            blocks = paint_runs(
+                (int(by1[k] - by0[k]) + 1, int(bx1[k] - bx0[k]) + 1),
+                rows[own] - by0[k],
+                starts[own] - bx0[k],
+                ends[own] - bx0[k],
+            )
+            labelled = bridged & np.repeat(np.repeat(blocks, f, axis=0), f, axis=1)[: y1 - y0, : x1 - x0]
+
+        lrows, lstarts, lends, lroots = label_runs(labelled)
+        lfirst, cx0, cy0, cx1, cy1 = run_boxes(lrows, lstarts, lends, lroots)
+        sized = (cx1 - cx0 + 1 >= min_width) & (cy1 - cy0 + 1 >= min_height)
+        rects = [Rect(int(a), int(b), int(c), int(d)) for a, b, c, d in zip(cx0[sized], cy0[sized], cx1[sized], cy1[sized])]
+        bordered = looks_like_bordered_rectangles(bridged, rects, border_band=border_band, min_coverage=line_coverage)
+        for rect, root, ok in zip(rects, lfirst[sized], bordered):
+            if ok:
+                # keep the page-wide raster order of first pixels that connected_components gives
+                key = (y0 + rect.y0, x0 + int(lstarts[root]))
+                found.append((key, Rect(x0 + rect.x0, y0 + rect.y0, x0 + rect.x1, y0 + rect.y1)))
+
+    found.sort(key=lambda item: item[0])
+    return [rect for _, rect in found]
+
+
 def detect_frames(
     image: Image.Image,
     threshold: int,
@@ -257,21 +473,149 @@ def detect_frames(
     border_band: int,
     line_coverage: float,
     bridge_gap: int,
+    pyramid: int = 0,
 ) -> List[Rect]:
     mask = to_dark_mask(image, threshold)
-    mask = bridge_small_gaps(mask, max_gap=bridge_gap)
-
-    candidates = []
-    for rect in connected_components(mask):
-        if rect.width < min_width or rect.height < min_height:
-            continue
-        if looks_like_bordered_rectangle(mask, rect, border_band=border_band, min_coverage=line_coverage):
-            candidates.append(rect)
+    if pyramid > 1:
+        candidates = pyramid_candidates(
+            mask,
+            pyramid,
+            min_width=min_width,
+            min_height=min_height,
+            border_band=border_band,
+            line_coverage=line_coverage,
+            bridge_gap=bridge_gap,
+        )
+    else:
+        mask = bridge_small_gaps(mask, max_gap=bridge_gap)
+        sized = [r for r in connected_components(mask) if r.width >= min_width and r.height >= min_height]
+        bordered = looks_like_bordered_rectangles(mask, sized, border_band=border_band, min_coverage=line_coverage)
+        candidates = [rect for rect, ok in zip(sized, bordered) if ok]
 
     candidates = dedupe_nested(candidates)
     return sort_reading_order(candidates)
 
 
+def band_candidates(
+    image: Image.Image,
+    top: int,
+    bottom: int,
+    threshold: int,
+    min_width: int,
+    min_height: int,
+    border_band: int,
+    line_coverage: float,
+    bridge_gap: int,
+) -> Tuple[List[Tuple[Tuple[int, int], Rect]], int]:
+    """
+    Frame candidates among the components that start in rows top..bottom-1,
+    plus the row the next band has to start at.
+
+    Components touching the band's last row may continue below; the next
+    band starts at the highest of them, so they are seen whole there.
+    Components that finish above that row are final here, the rest are left
+    for the next band. The row above the band is labelled along with it, so
+    the lower parts of components that started in an earlier band can be
+    recognised and dropped.
+    """
+    w, h = image.size
+    lo = max(top - 1, 0)
+    # bridging needs bridge_gap rows of context above and below
+    ext0, ext1 = max(lo - bridge_gap, 0), min(bottom + bridge_gap, h)
+    mask = to_dark_mask(image.crop((0, ext0, w, ext1)), threshold)
+    bridged = bridge_small_gaps(mask, max_gap=bridge_gap)[lo - ext0:bottom - ext0]
+    rows, starts, ends, roots = label_runs(bridged)
+    first, x0, y0, x1, y1 = run_boxes(rows, starts, ends, roots)
+
+    fresh = y0 + lo >= top
+    open_ = fresh & (y1 + lo == bottom - 1) if bottom < h else np.zeros_like(fresh)
+    next_top = int(y0[open_].min()) + lo if open_.any() else bottom
+
+    done = fresh & ~open_ & (y0 + lo < next_top)
+    done &= (x1 - x0 + 1 >= min_width) & (y1 - y0 + 1 >= min_height)
+    rects = [Rect(int(a), int(b), int(c), int(d)) for a, b, c, d in zip(x0[done], y0[done], x1[done], y1[done])]
+    bordered = looks_like_bordered_rectangles(bridged, rects, border_band=border_band, min_coverage=line_coverage)
+    found = [
+        ((lo + rect.y0, int(starts[root])), Rect(rect.x0, lo + rect.y0, rect.x1, lo + rect.y1))
+        for rect, root, ok in zip(rects, first[done], bordered)
+        if ok
+    ]
+    return found, next_top
+
+
+def detect_frames_streamed(
+    image: Image.Image,
+    band_height: int,
+    threshold: int,
+    min_width: int,
+    min_height: int,
+    border_band: int,
+    line_coverage: float,
+    bridge_gap: int,
+    tolerance: int = 2,
+) -> Iterator[List[Rect]]:
+    """
+    detect_frames for very tall pages, working through horizontal bands so
+    the masks and labels never cover more than a band (plus whatever tall
+    component is still open). Yields each group of frames, in reading
+    order, as soon as no later band can change it.
+
+    The frames are the same as detect_frames finds. Only the numbering can
+    differ: frames are ordered within each group, and groups follow the page
+    from top to bottom.
+    """
+    h = image.height
+    band = max(band_height, 2 * (bridge_gap + 1))
+    top, bottom = 0, min(band, h)
+    pending: List[Tuple[Tuple[int, int], Rect]] = []
+    # frames already yielded that could still swallow a later, smaller candidate
+    containers: List[Tuple[Tuple[int, int], Rect]] = []
+
+    while top < h:
+        found, next_top = band_candidates(
+            image,
+            top,
+            bottom,
+            threshold=threshold,
+            min_width=min_width,
+            min_height=min_height,
+            border_band=border_band,
+            line_coverage=line_coverage,
+            bridge_gap=bridge_gap,
+        )
+        if next_top == top:
+            # a component spans the whole band; widen it until the component ends
+            bottom = min(bottom + band, h)
+            continue
+        pending.extend(found)
+
+        # Later candidates start at or below next_top, so they can only contain
+        # a pending rect that starts within tolerance of it, and through it the
+        # rects nested inside that one. Everything else is settled.
+        unsettled = [item for item in pending if item[1].y0 >= next_top - tolerance] if next_top < h else []
+        grew = True
+        while grew:
+            grew = False
+            for item in pending:
+                if item not in unsettled and any(is_nested(item[1], other[1], tolerance) for other in unsettled):
+                    unsettled.append(item)
+                    grew = True
+
+        settled = [item for item in pending if item not in unsettled]
+        if settled:
+            # dedupe breaks area ties by raster order of first pixel, as detect_frames does
+            ordered = sorted(containers + pending, key=lambda item: item[0])
+            kept = {id(rect) for rect in dedupe_nested([rect for _, rect in ordered], tolerance)}
+            frames = [item for item in settled if id(item[1]) in kept]
+            containers.extend(frames)
+            pending = unsettled
+            if frames:
+                yield sort_reading_order([rect for _, rect in frames])
+
+        containers = [item for item in containers if item[1].y1 + tolerance >= next_top]
+        top, bottom = next_top, min(max(next_top + band, bottom + band // 2), h)
+
+
 def scale_to_canvas(frame: Image.Image, canvas_w: int, canvas_h: int, padding_frac: float) -> Image.Image:
     pad_x = int(round(canvas_w * padding_frac))
     pad_y = int(round(canvas_h * padding_frac))
@@ -290,6 +634,32 @@ def scale_to_canvas(frame: Image.Image, canvas_w: int, canvas_h: int, padding_fr
     return canvas
 
 
+EXPORT_FORMATS = {"png": ("PNG", ".png"), "webp": ("WEBP", ".webp"), "jpeg": ("JPEG", ".jpg")}
+# Instagram's limit on images per carousel post
+CAROUSEL_MAX = 20
+
+
+def save_frame(
+    image: Image.Image,
+    rect: Rect,
+    out_path: Path,
+    canvas_w: int,
+    canvas_h: int,
+    padding_frac: float,
+    fmt: str,
+    quality: int,
+) -> Path:
+    crop = image.crop((rect.x0, rect.y0, rect.x1 + 1, rect.y1 + 1)).convert("RGB")
+    insta = scale_to_canvas(crop, canvas_w=canvas_w, canvas_h=canvas_h, padding_frac=padding_frac)
+    if fmt == "png":
+        insta.save(out_path, "PNG")
+    elif fmt == "webp":
+        insta.save(out_path, "WEBP", quality=quality, method=4)
+    else:
+        insta.save(out_path, "JPEG", quality=quality, optimize=True, progressive=True)
+    return out_path
+
+
 def export_frames(
     image: Image.Image,
     frames: Sequence[Rect],
@@ -298,29 +668,315 @@ def export_frames(
     canvas_w: int,
     canvas_h: int,
     padding_frac: float,
+    first_index: int = 1,
+    fmt: str = "png",
+    quality: int = 90,
+    workers: int = 1,
 ) -> List[Path]:
+    """
+    Crop, fit and save every frame. With workers > 1 the frames are handled
+    on a thread pool; Pillow releases the GIL while resampling and encoding,
+    so the frames really do run side by side.
+    """
     outdir.mkdir(parents=True, exist_ok=True)
+    suffix = EXPORT_FORMATS[fmt][1]
+    paths = [outdir / f"{timestamp}-{idx:02d}{suffix}" for idx in range(first_index, first_index + len(frames))]
+
+    def save(rect: Rect, out_path: Path) -> Path:
+        return save_frame(image, rect, out_path, canvas_w, canvas_h, padding_frac, fmt, quality)
+
+    if workers <= 1 or len(frames) <= 1:
+        return [save(rect, path) for rect, path in zip(frames, paths)]
+    # a lazily opened page must be decoded once here, not by several threads at a time
+    image.load()
+    with ThreadPoolExecutor(max_workers=min(workers, len(frames))) as pool:
+        return list(pool.map(save, frames, paths))
+
+
+def write_carousel(paths: Sequence[Path], outdir: Path, timestamp: str) -> List[Path]:
+    """Zip the exported frames in order, CAROUSEL_MAX per archive, ready to upload as carousel posts."""
+    chunks = [paths[i:i + CAROUSEL_MAX] for i in range(0, len(paths), CAROUSEL_MAX)]
+    archives: List[Path] = []
+    for n, chunk in enumerate(chunks, start=1):
+        name = f"{timestamp}-carousel.zip" if len(chunks) == 1 else f"{timestamp}-carousel-{n}.zip"
+        archive = outdir / name
+        # the images are already compressed; storing them keeps the zip fast to write
+        with zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_STORED) as zf:
+            for path in chunk:
+                zf.write(path, arcname=path.name)
+        archives.append(archive)
+    return archives
+
+
+def stream_export(
+    image: Image.Image, band_height: int, detect: Dict[str, float], **export
+) -> Tuple[List[Rect], List[Path]]:
+    # Export each group of frames from detect_frames_streamed as soon as it closes
+    detect = {k: v for k, v in detect.items() if k != "pyramid"}
+    frames: List[Rect] = []
     written: List[Path] = []
+    for group in detect_frames_streamed(image, band_height, **detect):
+        written.extend(export_frames(image, group, first_index=len(frames) + 1, **export))
+        frames.extend(group)
+    return frames, written
 
-    for idx, rect in enumerate(frames, start=1):
-        crop = image.crop((rect.x0, rect.y0, rect.x1 + 1, rect.y1 + 1))
-        insta = scale_to_canvas(crop, canvas_w=canvas_w, canvas_h=canvas_h, padding_frac=padding_frac)
-        out_path = outdir / f"{timestamp}-{idx:02d}.png"
-        insta.save(out_path, "PNG")
-        written.append(out_path)
 
-    return written
+# ---------- batch ----------
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp", ".gif", ".bmp", ".tif", ".tiff"}
+LIST_SUFFIXES = {".txt", ".list"}
+
+
+def expand_sources(specs: Sequence[str]) -> List[str]:
+    """
+    Turn batch arguments into individual image sources: directories give
+    their images, glob patterns their matches, .txt/.list files one URL or
+    path per line (blank lines and # comments skipped).
+    """
+    sources: List[str] = []
+    for spec in specs:
+        if is_url(spec):
+            sources.append(spec)
+            continue
+        path = Path(spec).expanduser()
+        if path.is_dir():
+            sources.extend(str(p) for p in sorted(path.iterdir()) if p.suffix.lower() in IMAGE_SUFFIXES)
+        elif path.suffix.lower() in LIST_SUFFIXES and path.is_file():
+            for line in path.read_text(encoding="utf-8").splitlines():
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    sources.append(line if is_url(line) else str((path.parent / line).expanduser()))
+        elif glob.has_magic(spec):
+            sources.extend(sorted(p for p in glob.glob(os.path.expanduser(spec), recursive=True) if Path(p).is_file()))
+        else:
+            sources.append(spec)
+
+    # a page listed twice is only extracted once, however its path is spelled
+    unique: Dict[str, str] = {}
+    for source in sources:
+        key = source if is_url(source) else str(Path(source).expanduser().resolve())
+        unique.setdefault(key, source)
+    return list(unique.values())
+
+
+def source_slug(source: str, taken: Dict[str, int]) -> str:
+    # Subdirectory name for a source: its file stem, numbered when stems collide
+    stem = Path(urlparse(source).path if is_url(source) else source).stem
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "-", stem).strip("-.") or "page"
+    taken[slug] = taken.get(slug, 0) + 1
+    return slug if taken[slug] == 1 else f"{slug}-{taken[slug]}"
+
+
+@dataclass
+class ExtractJob:
+    source: str
+    outdir: Path
+    timestamp: str
+    detect: Dict[str, float]
+    export: Dict[str, object]
+    band_height: int = 0
+    carousel: bool = False
+    data: Optional[bytes] = None
+    fetch_seconds: float = 0.0
+
+
+@dataclass
+class ExtractResult:
+    source: str
+    outdir: str  # subdirectory of the batch outdir
+    frames: List[Dict[str, int]] = field(default_factory=list)
+    files: List[str] = field(default_factory=list)
+    carousel: List[str] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+def extract_job(job: ExtractJob) -> ExtractResult:
+    result = ExtractResult(source=job.source, outdir=job.outdir.name)
+    result.timings["fetch"] = round(job.fetch_seconds, 4)
+    try:
+        mode = None if job.band_height else "RGB"
+        started = time.perf_counter()
+        image = open_image(job.data, mode) if job.data is not None else load_image(job.source, mode)
+        result.timings["load"] = round(time.perf_counter() - started, 4)
+
+        if job.band_height:
+            started = time.perf_counter()
+            frames, written = stream_export(
+                image, job.band_height, job.detect, outdir=job.outdir, timestamp=job.timestamp, **job.export
+            )
+            # the page decodes lazily and detection and export interleave when streaming
+            result.timings["detect_export"] = round(time.perf_counter() - started, 4)
+        else:
+            started = time.perf_counter()
+            frames = detect_frames(image, **job.detect)
+            result.timings["detect"] = round(time.perf_counter() - started, 4)
+
+            started = time.perf_counter()
+            written = export_frames(image, frames, outdir=job.outdir, timestamp=job.timestamp, **job.export)
+            result.timings["export"] = round(time.perf_counter() - started, 4)
+
+        if job.carousel and written:
+            result.carousel = [path.name for path in write_carousel(written, job.outdir, job.timestamp)]
+    except (Exception, SystemExit) as exc:
+        result.error = str(exc) or type(exc).__name__
+        return result
+
+    result.frames = [asdict(rect) for rect in frames]
+    result.files = [path.name for path in written]
+    return result
+
+
+def run_batch(
+    sources: Sequence[str],
+    outdir: Path,
+    timestamp: str,
+    detect: Dict[str, float],
+    export: Dict[str, object],
+    workers: int,
+    fetch_workers: int,
+    band_height: int = 0,
+    carousel: bool = False,
+) -> List[ExtractResult]:
+    """
+    Extract frames from every source into outdir/<slug>/ and write
+    outdir/manifest.json. Remote pages are downloaded on a small thread pool
+    sharing one keep-alive session and handed to the process pool as they
+    arrive; local files are read by the worker processes themselves. Without
+    requests installed, URL sources fail one by one in the manifest.
+    """
+    outdir.mkdir(parents=True, exist_ok=True)
+    taken: Dict[str, int] = {}
+    jobs = [
+        ExtractJob(
+            source=source,
+            outdir=outdir / source_slug(source, taken),
+            timestamp=timestamp,
+            detect=detect,
+            export=export,
+            band_height=band_height,
+            carousel=carousel,
+        )
+        for source in sources
+    ]
+    results: Dict[str, ExtractResult] = {}
+    remote = [job for job in jobs if is_url(job.source)]
+    if remote and requests is None:
+        for job in remote:
+            results[job.source] = ExtractResult(
+                source=job.source, outdir=job.outdir.name, error="image URLs need the 'requests' package (pip install requests)"
+            )
+        remote = []
+
+    session = None
+    if remote:
+        session = requests.Session()
+        # one pooled connection per fetch thread, so keep-alive actually gets reused
+        adapter = requests.adapters.HTTPAdapter(pool_connections=fetch_workers, pool_maxsize=fetch_workers)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+    def fetch(job: ExtractJob) -> ExtractJob:
+        started = time.perf_counter()
+        job.data = fetch_bytes(session, job.source)
+        job.fetch_seconds = time.perf_counter() - started
+        return job
+
+    def failed(job: ExtractJob, exc: BaseException) -> ExtractResult:
+        return ExtractResult(source=job.source, outdir=job.outdir.name, error=str(exc) or type(exc).__name__)
+
+    # Both pools are fed a bounded number of jobs at a time, so a long URL
+    # list never holds more than a few downloaded pages in memory
+    queued: Dict[Future, ExtractJob] = {}
+    fetching: Dict[Future, ExtractJob] = {}
+    to_fetch = iter(remote)
+
+    def collect(futures: Dict[Future, ExtractJob]) -> None:
+        done, _ = wait(futures, return_when=FIRST_COMPLETED)
+        for future in done:
+            job = futures.pop(future)
+            # a worker killed by the OS breaks the pool: every job still in it fails, not the batch
+            try:
+                results[job.source] = future.result()
+            except Exception as exc:
+                results[job.source] = failed(job, exc)
+
+    def submit(job: ExtractJob) -> None:
+        while len(queued) >= 2 * workers:
+            collect(queued)
+        try:
+            queued[pool.submit(extract_job, job)] = job
+        except BrokenProcessPool as exc:
+            results[job.source] = failed(job, exc)
+
+    def refill() -> None:
+        for job in itertools.islice(to_fetch, 2 * fetch_workers - len(fetching)):
+            fetching[fetchers.submit(fetch, job)] = job
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool, ThreadPoolExecutor(max_workers=fetch_workers) as fetchers:
+            refill()
+            for job in jobs:
+                if not is_url(job.source):
+                    submit(job)
+            while fetching:
+                done, _ = wait(fetching, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = fetching.pop(future)
+                    try:
+                        future.result()
+                    except Exception as exc:
+                        results[job.source] = failed(job, exc)
+                    else:
+                        submit(job)
+                refill()
+            while queued:
+                collect(queued)
+    finally:
+        if session is not None:
+            session.close()
+        # written even when the batch is cut short, with whatever finished
+        ordered = [
+            results.get(job.source) or ExtractResult(source=job.source, outdir=job.outdir.name, error="not processed")
+            for job in jobs
+        ]
+        manifest = {
+            "timestamp": timestamp,
+            "detect": detect,
+            "export": export,
+            "band_height": band_height,
+            "sources": [asdict(result) for result in ordered],
+        }
+        (outdir / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return ordered
 
 
 def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(
         description="Detect black-bordered comic frames and export each one as a 1080x1350 Instagram image."
     )
-    p.add_argument("source", help="Image URL or local file path")
-    p.add_argument("--outdir", type=Path, default=Path("dist/ur"), help="Directory to write exported PNGs")
+    p.add_argument(
+        "source",
+        nargs="+",
+        help="Image URL or local file path; with --batch also directories, glob patterns and .txt/.list files of URLs or paths",
+    )
+    p.add_argument("--outdir", type=Path, default=Path("dist/ur"), help="Directory to write exported frames")
     p.add_argument("--width", type=int, default=1080, help="Output canvas width")
     p.add_argument("--height", type=int, default=1350, help="Output canvas height")
     p.add_argument("--padding-frac", type=float, default=0.06, help="Outer white margin as a fraction of canvas size")
+    p.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="png", help="Image format of the exported frames")
+    p.add_argument("--quality", type=int, default=90, help="Encoder quality for --format webp/jpeg (1-100)")
+    p.add_argument(
+        "--export-workers",
+        type=int,
+        default=None,
+        help="Threads exporting the frames of a page (default: one per CPU, or 1 per page in --batch)",
+    )
+    p.add_argument(
+        "--carousel",
+        action="store_true",
+        help=f"Also zip the exported frames into upload-ready carousels of up to {CAROUSEL_MAX}",
+    )
     p.add_argument("--threshold", type=int, default=70, help="Grayscale threshold for detecting black borders")
     p.add_argument("--min-width", type=int, default=100, help="Minimum rectangle width to count as a frame")
     p.add_argument("--min-height", type=int, default=100, help="Minimum rectangle height to count as a frame")
@@ -332,46 +988,108 @@ def build_parser() -> argparse.ArgumentParser:
         default=2,
         help="Fill tiny border interruptions up to this many pixels before rectangle detection",
     )
+    p.add_argument(
+        "--pyramid",
+        type=int,
+        default=0,
+        help="Find large structures on a copy shrunk by this factor first and only examine those at full "
+        "resolution (same frames, faster on big scans; 0 = off)",
+    )
+    p.add_argument(
+        "--band-height",
+        type=int,
+        default=0,
+        help="Detect in horizontal bands of this many rows and export frames as they close, for very tall "
+        "(webtoon) pages; memory follows the band, not the page (0 = whole page at once)",
+    )
+    p.add_argument(
+        "--batch",
+        action="store_true",
+        help="Extract every source into its own subdirectory of --outdir and write manifest.json",
+    )
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes for detection and export in --batch")
+    p.add_argument("--fetch-workers", type=int, default=8, help="Concurrent downloads in --batch")
     p.add_argument("--timestamp", default=None, help="Override timestamp prefix (default: current local time)")
     p.add_argument("--verbose", action="store_true", help="Print detected frame coordinates")
     return p
 
 
 def main() -> int:
-    args = build_parser().parse_args()
-    image = load_image(args.source)
-    frames = detect_frames(
-        image,
+    parser = build_parser()
+    args = parser.parse_args()
+    detect = dict(
         threshold=args.threshold,
         min_width=args.min_width,
         min_height=args.min_height,
         border_band=args.border_band,
         line_coverage=args.line_coverage,
         bridge_gap=args.bridge_gap,
+        pyramid=args.pyramid,
     )
-
-    if not frames:
-        raise SystemExit(
-            "No frames detected. Try increasing --threshold slightly, lowering --min-width/--min-height, or raising --bridge-gap."
-        )
-
     timestamp = args.timestamp or datetime.now().strftime("%Y%m%d-%H%M%S")
-    written = export_frames(
-        image,
-        frames,
-        outdir=args.outdir.expanduser(),
-        timestamp=timestamp,
+    # batch pages already run in parallel processes, so their frames default to one thread each
+    export_workers = args.export_workers or (1 if args.batch else os.cpu_count() or 1)
+    export = dict(
         canvas_w=args.width,
         canvas_h=args.height,
         padding_frac=args.padding_frac,
+        fmt=args.format,
+        quality=min(max(args.quality, 1), 100),
+        workers=max(1, export_workers),
     )
 
+    if args.batch:
+        sources = expand_sources(args.source)
+        if not sources:
+            raise SystemExit("No images found in the given sources.")
+        started = time.perf_counter()
+        results = run_batch(
+            sources,
+            outdir=args.outdir.expanduser(),
+            timestamp=timestamp,
+            detect=detect,
+            export=export,
+            workers=max(1, args.workers),
+            fetch_workers=max(1, args.fetch_workers),
+            band_height=max(0, args.band_height),
+            carousel=args.carousel,
+        )
+        for result in results:
+            status = f"error: {result.error}" if result.error else f"{len(result.frames)} frame(s)"
+            print(f"{result.source}: {status}")
+        failed = sum(1 for r in results if r.error)
+        print(
+            f"Extracted {sum(len(r.frames) for r in results)} frame(s) from {len(results) - failed} of "
+            f"{len(results)} source(s) in {time.perf_counter() - started:.1f}s; "
+            f"manifest: {(args.outdir.expanduser() / 'manifest.json').resolve()}"
+        )
+        return 1 if failed else 0
+
+    if len(args.source) > 1:
+        parser.error("several sources need --batch")
+    outdir = args.outdir.expanduser()
+    if args.band_height > 0:
+        image = load_image(args.source[0], mode=None)
+        frames, written = stream_export(image, args.band_height, detect, outdir=outdir, timestamp=timestamp, **export)
+    else:
+        image = load_image(args.source[0])
+        frames = detect_frames(image, **detect)
+        written = export_frames(image, frames, outdir=outdir, timestamp=timestamp, **export) if frames else []
+
+    if not frames:
+        raise SystemExit(
+            "No frames detected. Try increasing --threshold slightly, lowering --min-width/--min-height, or raising --bridge-gap."
+        )
+
     print(f"Detected {len(frames)} frame(s).")
     if args.verbose:
         for i, rect in enumerate(frames, start=1):
             print(f"  {i:02d}: x={rect.x0}..{rect.x1}, y={rect.y0}..{rect.y1}, w={rect.width}, h={rect.height}")
     for path in written:
         print(path.resolve())
+    if args.carousel:
+        for archive in write_carousel(written, outdir, timestamp):
+            print(archive.resolve())
     return 0
 
 
@@ -11,25 +11,104 @@
     python utterly_random_story_generator.py --out strip.png --seed 42
     python utterly_random_story_generator.py --theme museum --date 2026-03-14
     python utterly_random_story_generator.py --theme portal --seed 7 --width 1500 --height 320
+    python utterly_random_story_generator.py --theme split --out strip.svg
+    python utterly_random_story_generator.py --width 24000 --height 5000 --supersample 4 --out poster.png
+    python utterly_random_story_generator.py --serve --port 8080 --cache-dir /var/cache/strips
+    python utterly_random_story_generator.py --bench --seeds 1-5 --profile --bench-out bench.json
+    python utterly_random_story_generator.py --bench --seeds 1-5 --baseline bench.json
+    python utterly_random_story_generator.py --animate --theme portal --out strip.webp
+    python utterly_random_story_generator.py --batch --seeds 1-50 --themes museum,portal --dates 2026-03-01:2026-03-31
 """
 
 from __future__ import annotations
 
+import abc
 import argparse
+import collections
+import functools
+import hashlib
+import html
+import io
+import itertools
+import json
 import math
+import os
+import platform
 import random
-from dataclasses import dataclass, field
-from datetime import date
+import resource
+import statistics
+import struct
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field, replace
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Dict, List, Sequence, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+from urllib.parse import parse_qs, urlencode, urlsplit
 
-from PIL import Image, ImageColor, ImageDraw, ImageFilter, ImageFont
+from PIL import GifImagePlugin, Image, ImageChops, ImageColor, ImageDraw, ImageFilter, ImageFont
+
+# the streaming PNG writer lives at the repository root, shared with the other image scripts
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from pngstream import write_apng, write_png_rows  # noqa: E402
 
 
 Color = Tuple[int, int, int]
 Point = Tuple[float, float]
 
 
+# ---------- profiling hooks ----------
+
+# name -> [calls, inclusive seconds, self seconds]; None leaves the hooks disabled
+_PROFILE: Dict[str, List[float]] | None = None
+_PROFILE_LOCK = threading.Lock()
+# per thread: time spent in profiled callees of each open profiled call
+_PROFILE_STACKS = threading.local()
+
+
+def profiled(fn: Callable) -> Callable:
+    """Time calls to `fn` while profiling is enabled, attributing nested profiled calls to themselves."""
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        profile = _PROFILE
+        if profile is None:
+            return fn(*args, **kwargs)
+        children = _PROFILE_STACKS.__dict__.setdefault("children", [])
+        children.append(0.0)
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            child = children.pop()
+            if children:
+                children[-1] += elapsed
+            with _PROFILE_LOCK:
+                entry = profile.setdefault(name, [0, 0.0, 0.0])
+                entry[0] += 1
+                entry[1] += elapsed
+                entry[2] += elapsed - child
+
+    return wrapper
+
+
+def start_profile() -> None:
+    global _PROFILE
+    _PROFILE = {}
+
+
+def stop_profile() -> Dict[str, List[float]]:
+    global _PROFILE
+    result, _PROFILE = _PROFILE or {}, None
+    return result
+
+
 # ---------- small geometry helpers ----------
 
 def clamp(v: float, lo: float, hi: float) -> float:
@@ -44,6 +123,7 @@ def rgba(rgb: Color, a: int) -> Tuple[int, int, int, int]:
     return (rgb[0], rgb[1], rgb[2], a)
 
 
+@functools.lru_cache(maxsize=64)
 def load_font(size: int, mono: bool = False) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
     candidates = [
         "DejaVuSansMono.ttf" if mono else "DejaVuSans.ttf",
@@ -68,6 +148,7 @@ def regular_polygon(cx: float, cy: float, r: float, sides: int, rot: float = 0.0
     return pts
 
 
+@profiled
 def wobble_closed_poly(
     center: Point,
     rx: float,
@@ -94,8 +175,300 @@ def offset_polyline(points: Sequence[Point], dx: float, dy: float) -> List[Point
 
 # ---------- drawing helpers ----------
 
+def blur_reach(radius: float) -> int:
+    # GaussianBlur is three box-blur passes, each reaching at most ceil(radius) + 1 pixels
+    return 3 * (math.ceil(radius) + 1)
+
+
+@profiled
+def composite_blurred(
+    base: Image.Image,
+    bbox: Sequence[float],
+    radius: float,
+    paint: Callable[[ImageDraw.ImageDraw, int, int], None],
+    clip: Sequence[int] | None = None,
+) -> None:
+    """
+    Blur an effect and composite it onto `base`, allocating only its bounding
+    box plus the blur's reach instead of a full-canvas layer. `paint` draws
+    into the layer, whose top-left corner sits at the given canvas offset.
+    Pixels beyond the reach are untouched by the blur, so the result is
+    identical to blurring and compositing a full-size layer.
+
+    When `base` is a tile of a larger picture, `clip` is that picture's
+    extent in base coordinates; the layer then reaches past the tile as far
+    as the blur does, so tiles blend seamlessly into a single render.
+    """
+    pad = blur_reach(radius)
+    cx0, cy0, cx1, cy1 = clip if clip is not None else (0, 0, base.width, base.height)
+    x0 = max(cx0, -pad, math.floor(bbox[0]) - pad)
+    y0 = max(cy0, -pad, math.floor(bbox[1]) - pad)
+    x1 = min(cx1, base.width + pad, math.ceil(bbox[2]) + 1 + pad)
+    y1 = min(cy1, base.height + pad, math.ceil(bbox[3]) + 1 + pad)
+    if x0 >= x1 or y0 >= y1:
+        return
+    layer = Image.new("RGBA", (x1 - x0, y1 - y0), (0, 0, 0, 0))
+    paint(ImageDraw.Draw(layer), x0, y0)
+    layer = layer.filter(ImageFilter.GaussianBlur(radius=radius))
+    dx0, dy0 = max(0, x0), max(0, y0)
+    dx1, dy1 = min(base.width, x1), min(base.height, y1)
+    if dx0 >= dx1 or dy0 >= dy1:
+        return
+    if (dx0, dy0, dx1, dy1) != (x0, y0, x1, y1):
+        layer = layer.crop((dx0 - x0, dy0 - y0, dx1 - x0, dy1 - y0))
+    base.alpha_composite(layer, dest=(dx0, dy0))
+
+
+# ---------- drawing backends ----------
+
+class Canvas(abc.ABC):
+    """
+    The drawing surface the strip is built on. Coordinates, boxes and angles
+    follow ImageDraw's conventions so every backend gets the same geometry
+    from the same seed.
+    """
+
+    @abc.abstractmethod
+    def polygon(self, points: Sequence[Point], fill: Color) -> None:
+        ...
+
+    @abc.abstractmethod
+    def line(self, points: Sequence[Point], fill: Color, width: int = 1, joint: str | None = None) -> None:
+        ...
+
+    @abc.abstractmethod
+    def rectangle(self, box: Sequence[float], fill: Color | None = None, outline: Color | None = None, width: int = 1) -> None:
+        ...
+
+    @abc.abstractmethod
+    def ellipse(self, box: Sequence[float], fill: Color | None = None, outline: Color | None = None, width: int = 1) -> None:
+        ...
+
+    @abc.abstractmethod
+    def arc(self, box: Sequence[float], start: float, end: float, fill: Color, width: int = 1) -> None:
+        ...
+
+    @abc.abstractmethod
+    def text(self, xy: Point, text: str, size: int, fill: Color, anchor: str = "la", mono: bool = False) -> None:
+        ...
+
+    @abc.abstractmethod
+    def blurred(self, shape: str, box: Sequence[float], radius: float, fill: Tuple[int, int, int, int]) -> None:
+        """Draw a soft `shape` ("ellipse" or "rectangle") blurred by a Gaussian of `radius`."""
+
+    @abc.abstractmethod
+    def layer(self, origin: Tuple[int, int], size: Tuple[int, int], paint: Callable[..., None], *args) -> None:
+        """
+        Draw a static layer: paint(canvas, *args) in coordinates relative to
+        `origin`, covering `size`. Backends may cache the result per arguments.
+        """
+
+
+class PillowCanvas(Canvas):
+    def __init__(self, img: Image.Image, clip: Sequence[int] | None = None, offset: Tuple[int, int] = (0, 0)) -> None:
+        # clip: extent of the whole picture in img coordinates when img is one tile of it;
+        # offset: picture coordinates of img's top-left corner, subtracted from everything drawn
+        self.img = img
+        self.draw = ImageDraw.Draw(img)
+        self.clip = clip
+        self.ox, self.oy = offset
+
+    def _pts(self, points: Sequence[Point]) -> list:
+        if self.ox or self.oy:
+            points = [(x - self.ox, y - self.oy) for x, y in points]
+        return floor_negative(points)
+
+    def _box(self, box: Sequence[float]) -> list:
+        if self.ox or self.oy:
+            box = [box[0] - self.ox, box[1] - self.oy, box[2] - self.ox, box[3] - self.oy]
+        return floor_negative(box)
+
+    def polygon(self, points: Sequence[Point], fill: Color) -> None:
+        self.draw.polygon(self._pts(points), fill=fill)
+
+    def line(self, points: Sequence[Point], fill: Color, width: int = 1, joint: str | None = None) -> None:
+        self.draw.line(self._pts(points), fill=fill, width=width, joint=joint)
+
+    def rectangle(self, box: Sequence[float], fill: Color | None = None, outline: Color | None = None, width: int = 1) -> None:
+        self.draw.rectangle(self._box(box), fill=fill, outline=outline, width=width)
+
+    def ellipse(self, box: Sequence[float], fill: Color | None = None, outline: Color | None = None, width: int = 1) -> None:
+        self.draw.ellipse(self._box(box), fill=fill, outline=outline, width=width)
+
+    def arc(self, box: Sequence[float], start: float, end: float, fill: Color, width: int = 1) -> None:
+        self.draw.arc(self._box(box), start=start, end=end, fill=fill, width=width)
+
+    def text(self, xy: Point, text: str, size: int, fill: Color, anchor: str = "la", mono: bool = False) -> None:
+        self.draw.text((xy[0] - self.ox, xy[1] - self.oy), text, font=load_font(size, mono=mono), fill=fill, anchor=anchor)
+
+    def blurred(self, shape: str, box: Sequence[float], radius: float, fill: Tuple[int, int, int, int]) -> None:
+        box = [box[0] - self.ox, box[1] - self.oy, box[2] - self.ox, box[3] - self.oy]
+
+        def paint(d: ImageDraw.ImageDraw, ox: int, oy: int) -> None:
+            getattr(d, shape)(floor_negative([box[0] - ox, box[1] - oy, box[2] - ox, box[3] - oy]), fill=fill)
+
+        composite_blurred(self.img, box, radius, paint, self.clip)
+
+    def layer(self, origin: Tuple[int, int], size: Tuple[int, int], paint: Callable[..., None], *args) -> None:
+        self.img.paste(pillow_layer(size, paint, args), (origin[0] - self.ox, origin[1] - self.oy))
+
+
+def floor_negative(coords: Sequence) -> list:
+    """
+    ImageDraw truncates coordinates toward zero, which floors them on the
+    canvas but not left of or above it. Flooring negative ones as well keeps
+    shapes that start outside a tile rasterised exactly as on the full canvas.
+    """
+    out = []
+    for c in coords:
+        if isinstance(c, (tuple, list)):
+            out.append(tuple(math.floor(v) if v < 0 else v for v in c))
+        else:
+            out.append(math.floor(c) if c < 0 else c)
+    return out
+
+
+# Static layers are kept least-recently-used up to this many bytes per
+# process; a layer bigger than a quarter of it is simply drawn every time,
+# so a few huge service renders cannot pin hundreds of MB
+LAYER_CACHE_BYTES = 64 << 20
+_LAYERS: "collections.OrderedDict[tuple, Image.Image]" = collections.OrderedDict()
+_LAYERS_SIZE = 0
+_LAYERS_LOCK = threading.Lock()
+
+
+def pillow_layer(size: Tuple[int, int], paint: Callable[..., None], args: tuple) -> Image.Image:
+    # shared between strips, so callers paste it and must not draw on it
+    global _LAYERS_SIZE
+    key = (size, paint, args)
+    with _LAYERS_LOCK:
+        img = _LAYERS.get(key)
+        if img is not None:
+            _LAYERS.move_to_end(key)
+            return img
+    img = Image.new("RGBA", size, (255, 255, 255, 255))
+    paint(PillowCanvas(img), *args)
+    nbytes = size[0] * size[1] * 4
+    if nbytes <= LAYER_CACHE_BYTES // 4:
+        with _LAYERS_LOCK:
+            if key not in _LAYERS:
+                _LAYERS[key] = img
+                _LAYERS_SIZE += nbytes
+                while _LAYERS_SIZE > LAYER_CACHE_BYTES:
+                    _, old = _LAYERS.popitem(last=False)
+                    _LAYERS_SIZE -= old.width * old.height * 4
+    return img
+
+
+def svg_num(v: float) -> str:
+    return f"{v:.2f}".rstrip("0").rstrip(".")
+
+
+def svg_color(rgb: Sequence[int]) -> str:
+    return "#%02x%02x%02x" % tuple(rgb[:3])
+
+
+SVG_ANCHORS = {"l": "start", "m": "middle", "r": "end"}
+SVG_BASELINES = {"a": "text-before-edge", "t": "text-before-edge", "m": "central", "s": "alphabetic", "b": "text-after-edge", "d": "text-after-edge"}
+
+
+class SvgCanvas(Canvas):
+    """
+    Writes the strip as SVG elements. Everything sits in a group shifted by
+    half a pixel so integer coordinates land on pixel centres as they do in
+    ImageDraw; boxes are inclusive and outlines are inset the way ImageDraw
+    strokes them. Blurred shapes use feGaussianBlur with the standard
+    deviation Pillow's GaussianBlur takes as its radius.
+    """
+
+    def __init__(self, width: int, height: int) -> None:
+        self.width = width
+        self.height = height
+        self.parts: List[str] = []
+        self.blurs: Dict[str, str] = {}
+
+    def _stroke(self, outline: Color | None, width: int) -> str:
+        if outline is None:
+            return ""
+        return f' stroke="{svg_color(outline)}" stroke-width="{width}"'
+
+    def polygon(self, points: Sequence[Point], fill: Color) -> None:
+        pts = " ".join(f"{svg_num(x)},{svg_num(y)}" for x, y in points)
+        self.parts.append(f'<polygon points="{pts}" fill="{svg_color(fill)}"/>')
+
+    def line(self, points: Sequence[Point], fill: Color, width: int = 1, joint: str | None = None) -> None:
+        pts = " ".join(f"{svg_num(x)},{svg_num(y)}" for x, y in points)
+        join = ' stroke-linejoin="round"' if joint == "curve" else ""
+        self.parts.append(f'<polyline points="{pts}" fill="none" stroke="{svg_color(fill)}" stroke-width="{width}"{join}/>')
+
+    def rectangle(self, box: Sequence[float], fill: Color | None = None, outline: Color | None = None, width: int = 1) -> None:
+        inset = width / 2 if outline is not None else 0
+        x0, y0, x1, y1 = box[0] - 0.5 + inset, box[1] - 0.5 + inset, box[2] + 0.5 - inset, box[3] + 0.5 - inset
+        self.parts.append(
+            f'<rect x="{svg_num(x0)}" y="{svg_num(y0)}" width="{svg_num(x1 - x0)}" height="{svg_num(y1 - y0)}"'
+            f' fill="{svg_color(fill) if fill else "none"}"{self._stroke(outline, width)}/>'
+        )
+
+    def ellipse(self, box: Sequence[float], fill: Color | None = None, outline: Color | None = None, width: int = 1) -> None:
+        inset = width / 2 if outline is not None else 0
+        self.parts.append(
+            f'<ellipse cx="{svg_num((box[0] + box[2]) / 2)}" cy="{svg_num((box[1] + box[3]) / 2)}"'
+            f' rx="{svg_num((box[2] - box[0] + 1) / 2 - inset)}" ry="{svg_num((box[3] - box[1] + 1) / 2 - inset)}"'
+            f' fill="{svg_color(fill) if fill else "none"}"{self._stroke(outline, width)}/>'
+        )
+
+    def arc(self, box: Sequence[float], start: float, end: float, fill: Color, width: int = 1) -> None:
+        cx, cy = (box[0] + box[2]) / 2, (box[1] + box[3]) / 2
+        rx, ry = (box[2] - box[0] + 1) / 2 - width / 2, (box[3] - box[1] + 1) / 2 - width / 2
+        a0, a1 = math.radians(start), math.radians(end)
+        large = 1 if (end - start) % 360 > 180 else 0
+        self.parts.append(
+            f'<path d="M {svg_num(cx + rx * math.cos(a0))} {svg_num(cy + ry * math.sin(a0))}'
+            f' A {svg_num(rx)} {svg_num(ry)} 0 {large} 1 {svg_num(cx + rx * math.cos(a1))} {svg_num(cy + ry * math.sin(a1))}"'
+            f' fill="none" stroke="{svg_color(fill)}" stroke-width="{width}"/>'
+        )
+
+    def text(self, xy: Point, text: str, size: int, fill: Color, anchor: str = "la", mono: bool = False) -> None:
+        family = "DejaVu Sans Mono, Menlo, Consolas, monospace" if mono else "DejaVu Sans, Arial, sans-serif"
+        self.parts.append(
+            f'<text x="{svg_num(xy[0])}" y="{svg_num(xy[1])}" font-family="{family}" font-size="{size}"'
+            f' text-anchor="{SVG_ANCHORS[anchor[0]]}" dominant-baseline="{SVG_BASELINES[anchor[1]]}"'
+            f' fill="{svg_color(fill)}">{html.escape(text)}</text>'
+        )
+
+    def blurred(self, shape: str, box: Sequence[float], radius: float, fill: Tuple[int, int, int, int]) -> None:
+        key = svg_num(radius)
+        if key not in self.blurs:
+            # user-space filter region over the whole canvas so wide blurs never clip
+            self.blurs[key] = (
+                f'<filter id="blur{len(self.blurs)}" filterUnits="userSpaceOnUse" x="-1" y="-1"'
+                f' width="{self.width + 2}" height="{self.height + 2}"><feGaussianBlur stdDeviation="{key}"/></filter>'
+            )
+        fid = self.blurs[key].split('"', 2)[1]
+        before = len(self.parts)
+        getattr(self, shape)(box, fill=fill[:3])
+        self.parts[before] = self.parts[before].replace("/>", f' fill-opacity="{svg_num(fill[3] / 255)}" filter="url(#{fid})"/>', 1)
+
+    def layer(self, origin: Tuple[int, int], size: Tuple[int, int], paint: Callable[..., None], *args) -> None:
+        self.parts.append(f'<g transform="translate({origin[0]} {origin[1]})">')
+        paint(self, *args)
+        self.parts.append("</g>")
+
+    def to_svg(self) -> str:
+        defs = f"<defs>{''.join(self.blurs.values())}</defs>" if self.blurs else ""
+        body = "\n".join(self.parts)
+        return (
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.width}" height="{self.height}"'
+            f' viewBox="0 0 {self.width} {self.height}">\n{defs}\n'
+            f'<rect width="{self.width}" height="{self.height}" fill="#ffffff"/>\n'
+            f'<g transform="translate(0.5 0.5)">\n{body}\n</g>\n</svg>\n'
+        )
+
+
+# ---------- figures ----------
+
 def draw_wobbly_outline(
-    draw: ImageDraw.ImageDraw,
+    canvas: Canvas,
     points: Sequence[Point],
     color: Color = (0, 0, 0),
     width: int = 3,
@@ -103,21 +476,18 @@ def draw_wobbly_outline(
     if len(points) < 2:
         return
     pts = list(points) + [points[0]]
-    draw.line(pts, fill=color, width=width, joint="curve")
+    canvas.line(pts, fill=color, width=width, joint="curve")
 
 
-def draw_shadow(base: Image.Image, center: Point, rx: float, ry: float, alpha: int = 48) -> None:
-    shadow = Image.new("RGBA", base.size, (0, 0, 0, 0))
-    d = ImageDraw.Draw(shadow)
+@profiled
+def draw_shadow(canvas: Canvas, center: Point, rx: float, ry: float, alpha: int = 48) -> None:
     cx, cy = center
-    bbox = [cx - rx, cy - ry, cx + rx, cy + ry]
-    d.ellipse(bbox, fill=(0, 0, 0, alpha))
-    shadow = shadow.filter(ImageFilter.GaussianBlur(radius=max(2, int(rx * 0.08))))
-    base.alpha_composite(shadow)
+    canvas.blurred("ellipse", [cx - rx, cy - ry, cx + rx, cy + ry], max(2, int(rx * 0.08)), (0, 0, 0, alpha))
 
 
+@profiled
 def draw_blob(
-    img: Image.Image,
+    canvas: Canvas,
     box: Tuple[int, int, int, int],
     rng: random.Random,
     expression: str = "neutral",
@@ -130,7 +500,6 @@ def draw_blob(
     lean: float = 0.0,
     y_shift: float = 0.0,
 ) -> Dict[str, Tuple[float, float]]:
-    draw = ImageDraw.Draw(img)
     x0, y0, x1, y1 = box
     w = x1 - x0
     h = y1 - y0
@@ -140,12 +509,12 @@ def draw_blob(
     rx = w * 0.18 * scale
     ry = h * 0.26 * scale
 
-    draw_shadow(img, (cx, cy + ry * 0.98), rx * 0.50, ry * 0.14, alpha=36 if tint is None else 30)
+    draw_shadow(canvas, (cx, cy + ry * 0.98), rx * 0.50, ry * 0.14, alpha=36 if tint is None else 30)
 
     body_fill = tint if tint else (236, 236, 236)
     body = wobble_closed_poly((cx, cy), rx, ry, rng, points=36, jitter=max(2.0, w * 0.007))
-    draw.polygon(body, fill=body_fill)
-    draw_wobbly_outline(draw, body, color=(20, 20, 20), width=max(2, int(w * 0.01)))
+    canvas.polygon(body, fill=body_fill)
+    draw_wobbly_outline(canvas, body, color=(20, 20, 20), width=max(2, int(w * 0.01)))
 
     if stripes:
         stripe_color = (180, 205, 232)
@@ -157,8 +526,8 @@ def draw_blob(
                 y = cy - ry * 0.70 + t * ry * 1.42
                 x = sx + math.sin(t * math.tau * 1.4) * rx * 0.05
                 path.append((x, y))
-            draw.line(path, fill=stripe_color, width=max(4, int(w * 0.018)))
-            draw.line(path, fill=(40, 40, 40), width=max(1, int(w * 0.006)))
+            canvas.line(path, fill=stripe_color, width=max(4, int(w * 0.018)))
+            canvas.line(path, fill=(40, 40, 40), width=max(1, int(w * 0.006)))
 
     eye_y = cy - ry * 0.24
     if look == "left":
@@ -175,11 +544,11 @@ def draw_blob(
 
     def eye_vertical(pt: Point) -> None:
         x, y = pt
-        draw.line([(x, y - eye_len / 2), (x, y + eye_len / 2)], fill=(25, 25, 25), width=max(1, int(w * 0.006)))
+        canvas.line([(x, y - eye_len / 2), (x, y + eye_len / 2)], fill=(25, 25, 25), width=max(1, int(w * 0.006)))
 
     def eye_sleep(pt: Point) -> None:
         x, y = pt
-        draw.line([(x - eye_len / 2, y), (x + eye_len / 2, y)], fill=(25, 25, 25), width=max(1, int(w * 0.006)))
+        canvas.line([(x - eye_len / 2, y), (x + eye_len / 2, y)], fill=(25, 25, 25), width=max(1, int(w * 0.006)))
 
     eye_vertical(left_eye)
     eye_vertical(right_eye)
@@ -189,20 +558,20 @@ def eye_sleep(pt: Point) -> None:
     mx1 = cx + rx * 0.07
 
     if expression == "smile":
-        draw.arc([mx0, mouth_y - ry * 0.08, mx1, mouth_y + ry * 0.10], start=18, end=162, fill=(25, 25, 25), width=max(1, int(w * 0.006)))
+        canvas.arc([mx0, mouth_y - ry * 0.08, mx1, mouth_y + ry * 0.10], start=18, end=162, fill=(25, 25, 25), width=max(1, int(w * 0.006)))
     elif expression == "neutral":
-        draw.line([(mx0, mouth_y), (mx1, mouth_y)], fill=(25, 25, 25), width=max(1, int(w * 0.006)))
+        canvas.line([(mx0, mouth_y), (mx1, mouth_y)], fill=(25, 25, 25), width=max(1, int(w * 0.006)))
     elif expression == "skeptical":
-        draw.line([(mx0, mouth_y + 3), (mx1, mouth_y - 2)], fill=(25, 25, 25), width=max(1, int(w * 0.006)))
+        canvas.line([(mx0, mouth_y + 3), (mx1, mouth_y - 2)], fill=(25, 25, 25), width=max(1, int(w * 0.006)))
     elif expression == "sleepy":
         eye_sleep(left_eye)
         eye_sleep(right_eye)
-        draw.line([(mx0, mouth_y), (mx1, mouth_y)], fill=(25, 25, 25), width=max(1, int(w * 0.006)))
+        canvas.line([(mx0, mouth_y), (mx1, mouth_y)], fill=(25, 25, 25), width=max(1, int(w * 0.006)))
     elif expression == "surprised":
         r = max(3, int(w * 0.012))
-        draw.ellipse([cx - r, mouth_y - r, cx + r, mouth_y + r], outline=(25, 25, 25), width=max(1, int(w * 0.006)))
+        canvas.ellipse([cx - r, mouth_y - r, cx + r, mouth_y + r], outline=(25, 25, 25), width=max(1, int(w * 0.006)))
     elif expression == "sad":
-        draw.arc([mx0, mouth_y - ry * 0.02, mx1, mouth_y + ry * 0.14], start=200, end=340, fill=(25, 25, 25), width=max(1, int(w * 0.006)))
+        canvas.arc([mx0, mouth_y - ry * 0.02, mx1, mouth_y + ry * 0.14], start=200, end=340, fill=(25, 25, 25), width=max(1, int(w * 0.006)))
     elif expression == "none":
         pass
 
@@ -214,15 +583,15 @@ def eye_sleep(pt: Point) -> None:
             y = cy - ry * 0.60 + t * ry * 1.16
             x = base_x + (rx * 0.05 if i % 2 else -rx * 0.03)
             crack.append((x, y))
-        draw.line(crack, fill=(35, 35, 35), width=max(1, int(w * 0.007)))
+        canvas.line(crack, fill=(35, 35, 35), width=max(1, int(w * 0.007)))
 
     if framed:
         margin = w * 0.05
         fx0, fy0, fx1, fy1 = x0 + margin, y0 + margin, x1 - margin, y1 - margin
-        draw.rectangle([fx0, fy0, fx1, fy1], outline=(40, 90, 110), width=max(5, int(w * 0.024)))
+        canvas.rectangle([fx0, fy0, fx1, fy1], outline=(40, 90, 110), width=max(5, int(w * 0.024)))
         for i in range(4):
             inset = i + 1
-            draw.rectangle([fx0 + inset, fy0 + inset, fx1 - inset, fy1 - inset], outline=(70, 150, 170), width=1)
+            canvas.rectangle([fx0 + inset, fy0 + inset, fx1 - inset, fy1 - inset], outline=(70, 150, 170), width=1)
 
     return {
         "center": (cx, cy),
@@ -233,27 +602,29 @@ def eye_sleep(pt: Point) -> None:
     }
 
 
-def draw_frame(draw: ImageDraw.ImageDraw, box: Tuple[int, int, int, int], fill: Color) -> None:
-    draw.rectangle(box, fill=fill, outline=(40, 40, 40), width=2)
+def draw_frame(canvas: Canvas, box: Tuple[int, int, int, int], fill: Color) -> None:
+    canvas.rectangle(box, fill=fill, outline=(40, 40, 40), width=2)
 
 
-def draw_portal(draw: ImageDraw.ImageDraw, center: Point, radius: float, color: Color) -> None:
+@profiled
+def draw_portal(canvas: Canvas, center: Point, radius: float, color: Color) -> None:
     cx, cy = center
-    draw.ellipse([cx - radius, cy - radius, cx + radius, cy + radius], fill=color, outline=(30, 30, 30), width=2)
-    draw.ellipse([cx - radius * 0.55, cy - radius * 0.55, cx + radius * 0.55, cy + radius * 0.55], fill=(250, 250, 250), outline=(30, 30, 30), width=1)
+    canvas.ellipse([cx - radius, cy - radius, cx + radius, cy + radius], fill=color, outline=(30, 30, 30), width=2)
+    canvas.ellipse([cx - radius * 0.55, cy - radius * 0.55, cx + radius * 0.55, cy + radius * 0.55], fill=(250, 250, 250), outline=(30, 30, 30), width=1)
 
 
-def draw_arrow(draw: ImageDraw.ImageDraw, start: Point, end: Point, color: Color = (120, 220, 40)) -> None:
+@profiled
+def draw_arrow(canvas: Canvas, start: Point, end: Point, color: Color = (120, 220, 40)) -> None:
     x0, y0 = start
     x1, y1 = end
-    draw.line([start, end], fill=color, width=8)
+    canvas.line([start, end], fill=color, width=8)
     angle = math.atan2(y1 - y0, x1 - x0)
     head = 18
     a1 = angle + math.radians(150)
     a2 = angle - math.radians(150)
     p1 = (x1 + math.cos(a1) * head, y1 + math.sin(a1) * head)
     p2 = (x1 + math.cos(a2) * head, y1 + math.sin(a2) * head)
-    draw.polygon([end, p1, p2], fill=color)
+    canvas.polygon([end, p1, p2], fill=color)
 
 
 # ---------- story templates ----------
@@ -340,42 +711,44 @@ class ComicConfig:
     bg: Color = (239, 239, 239)
 
 
-def draw_sidebar(img: Image.Image, cfg: ComicConfig) -> None:
-    draw = ImageDraw.Draw(img)
-    x0, y0, x1, y1 = 0, 0, cfg.gutter_width - 1, cfg.height - 1
-    draw.rectangle([x0, y0, x1, y1], fill=(250, 250, 250), outline=(40, 40, 40), width=2)
-
-    small = load_font(max(9, cfg.height // 28), mono=True)
-    vert = load_font(max(10, cfg.height // 18), mono=True)
-    date_font = load_font(max(9, cfg.height // 30), mono=True)
+def draw_sidebar_base(canvas: Canvas, gutter_width: int, height: int) -> None:
+    # the parts of the sidebar that only depend on the strip size: frame, logo and vertical title
+    canvas.rectangle([0, 0, gutter_width - 1, height - 1], fill=(250, 250, 250), outline=(40, 40, 40), width=2)
 
     # simple UR-ish block logo
-    draw.rectangle([12, 6, 53, 36], outline=(30, 30, 30), width=1)
+    canvas.rectangle([12, 6, 53, 36], outline=(30, 30, 30), width=1)
     for x in (14, 23, 32, 41, 50):
-        draw.line([(x, 6), (x, 26)], fill=(30, 30, 30), width=1)
-    draw.line([(14, 26), (50, 26)], fill=(30, 30, 30), width=1)
+        canvas.line([(x, 6), (x, 26)], fill=(30, 30, 30), width=1)
+    canvas.line([(14, 26), (50, 26)], fill=(30, 30, 30), width=1)
 
-    draw.rectangle([12, 48, 53, 95], outline=(30, 30, 30), width=1)
+    canvas.rectangle([12, 48, 53, 95], outline=(30, 30, 30), width=1)
     for yy in (53, 62, 71, 80):
-        draw.line([(12, yy), (53, yy)], fill=(30, 30, 30), width=1)
+        canvas.line([(12, yy), (53, yy)], fill=(30, 30, 30), width=1)
     for xx in (12, 22, 32, 42, 53):
-        draw.line([(xx, 48), (xx, 95)], fill=(30, 30, 30), width=1)
+        canvas.line([(xx, 48), (xx, 95)], fill=(30, 30, 30), width=1)
 
-    tx = cfg.gutter_width - 13
+    tx = gutter_width - 13
     ty = 30
-    step = max(10, cfg.height // 18)
+    step = max(10, height // 18)
     for ch in "UTTERLY RANDOM":
         if ch == " ":
             ty += step
             continue
-        draw.text((tx, ty), ch, font=vert, fill=(20, 20, 20), anchor="mm")
+        canvas.text((tx, ty), ch, max(10, height // 18), fill=(20, 20, 20), anchor="mm", mono=True)
         ty += step
 
-    draw.text((cfg.gutter_width // 2, cfg.height - 12), cfg.date_text, font=date_font, fill=(20, 20, 20), anchor="ms")
+
+@profiled
+def draw_sidebar(canvas: Canvas, cfg: ComicConfig) -> None:
+    # the layer also covers title glyphs that reach past the gutter on tall strips
+    span = min(cfg.width, max(cfg.gutter_width, cfg.gutter_width - 13 + max(10, cfg.height // 18)))
+    canvas.layer((0, 0), (span, cfg.height), draw_sidebar_base, cfg.gutter_width, cfg.height)
+
+    canvas.text((cfg.gutter_width // 2, cfg.height - 12), cfg.date_text, max(9, cfg.height // 30), fill=(20, 20, 20), anchor="ms", mono=True)
 
     epi_color = (0, 130, 255) if cfg.theme != "museum" else (220, 0, 0)
-    draw.text((cfg.gutter_width // 2, cfg.height - 62), str(cfg.episode), font=small, fill=epi_color, anchor="mm")
-    draw.ellipse([cfg.gutter_width // 2 - 2, cfg.height - 86, cfg.gutter_width // 2 + 2, cfg.height - 82], fill=epi_color)
+    canvas.text((cfg.gutter_width // 2, cfg.height - 62), str(cfg.episode), max(9, cfg.height // 28), fill=epi_color, anchor="mm", mono=True)
+    canvas.ellipse([cfg.gutter_width // 2 - 2, cfg.height - 86, cfg.gutter_width // 2 + 2, cfg.height - 82], fill=epi_color)
 
 
 def panel_boxes(cfg: ComicConfig) -> List[Tuple[int, int, int, int]]:
@@ -392,103 +765,1025 @@ def panel_boxes(cfg: ComicConfig) -> List[Tuple[int, int, int, int]]:
     return boxes
 
 
-def render_background(draw: ImageDraw.ImageDraw, box: Tuple[int, int, int, int], idx: int, story_name: str) -> None:
+def render_background(canvas: Canvas, box: Tuple[int, int, int, int], idx: int, story_name: str) -> None:
     if story_name == "museum" and idx == 4:
-        draw.rectangle(box, fill=(104, 166, 188), outline=(40, 40, 40), width=2)
+        canvas.rectangle(box, fill=(104, 166, 188), outline=(40, 40, 40), width=2)
         x0, y0, x1, y1 = box
         for j in range(10):
             t = j / 9
             yy = lerp(y0, y1, t)
             col = int(lerp(180, 90, t))
-            draw.line([(x0, yy), (x1, yy)], fill=(col, col + 20, col + 30), width=1)
+            canvas.line([(x0, yy), (x1, yy)], fill=(col, col + 20, col + 30), width=1)
+        return
+    canvas.rectangle(box, fill=(238, 238, 238), outline=(40, 40, 40), width=2)
+
+
+@profiled
+def paste_background(canvas: Canvas, box: Tuple[int, int, int, int], idx: int, story_name: str) -> None:
+    x0, y0, x1, y1 = box
+    w, h = x1 - x0 + 1, y1 - y0 + 1
+    canvas.layer((x0, y0), (w, h), render_background, (0, 0, w - 1, h - 1), idx, story_name)
+
+
+@profiled
+def render_panel(canvas: Canvas, cfg: ComicConfig, idx: int, box: Tuple[int, int, int, int], beat: StoryBeat, rng: random.Random) -> None:
+    paste_background(canvas, box, idx, cfg.theme)
+    x0, y0, x1, y1 = box
+    pw, ph = x1 - x0, y1 - y0
+
+    if beat.extra == "empty":
+        # just portal left behind
+        portal = (x0 + pw * 0.23, y0 + ph * 0.48)
+        draw_portal(canvas, portal, pw * 0.05, (90, 170, 255))
         return
-    draw.rectangle(box, fill=(238, 238, 238), outline=(40, 40, 40), width=2)
+    if beat.extra == "empty_sky":
+        for j in range(5):
+            yy = y0 + j * ph / 5
+            col = int(lerp(240, 225, j / 4))
+            canvas.line([(x0, yy), (x1, yy)], fill=(col, col, col), width=1)
+        return
+
+    blob_box = (x0 + int(pw * 0.08), y0 + int(ph * 0.03), x1 - int(pw * 0.08), y1 - int(ph * 0.08))
 
+    if beat.extra == "double":
+        draw_blob(canvas, (x0 + int(pw * 0.06), y0 + int(ph * 0.06), x0 + int(pw * 0.62), y1 - int(ph * 0.08)),
+                  rng, expression="sad", look="left", scale=0.84)
+        draw_blob(canvas, (x0 + int(pw * 0.38), y0 + int(ph * 0.03), x1 - int(pw * 0.05), y1 - int(ph * 0.10)),
+                  rng, expression="neutral", look="right", scale=0.84)
+        return
+
+    features = draw_blob(
+        canvas, blob_box, rng,
+        expression=beat.expression,
+        look=beat.look,
+        stripes=beat.stripes,
+        framed=beat.framed,
+        cracked=beat.cracked,
+        tint=beat.tint,
+        scale=beat.scale,
+        lean=beat.lean,
+        y_shift=beat.y_shift,
+    )
 
-def render_strip(cfg: ComicConfig) -> Image.Image:
-    rng = random.Random(cfg.seed)
+    if beat.dot is not None:
+        dx = x0 + pw * beat.dot[0]
+        dy = y0 + ph * beat.dot[1]
+        draw_portal(canvas, (dx, dy), pw * 0.045, (90, 170, 255))
+        if idx in (1, 2):
+            draw_arrow(canvas, features["mouth"], (dx - 10, dy - 8))
+    if cfg.theme == "museum" and idx == 4:
+        # extra "painting" feeling
+        fx0, fy0, fx1, fy1 = x0 + 10, y0 + 10, x1 - 10, y1 - 10
+        canvas.blurred("rectangle", [fx0 + 6, fy0 + 8, fx1 + 6, fy1 + 8], 3, (0, 0, 0, 35))
+
+
+def panel_rng(seed: int, idx: int) -> random.Random:
+    # an independent stream per panel, so each panel's wobble depends on nothing drawn before it
+    digest = hashlib.sha256(f"{seed}/panel/{idx}".encode("ascii")).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def panel_reach(cfg: ComicConfig, box: Tuple[int, int, int, int]) -> Tuple[int, int, int, int]:
+    # everything a panel draws stays within its box plus the blurred shadows' spill
+    x0, y0, x1, y1 = box
+    pad = blur_reach(max(3, (x1 - x0) * 0.01)) + 10
+    return (max(0, x0 - pad), max(0, y0 - pad), min(cfg.width, x1 + 1 + pad), min(cfg.height, y1 + 1 + pad))
+
+
+def draw_strip(canvas: Canvas, cfg: ComicConfig) -> None:
     story = STORIES[cfg.theme]()
+
+    draw_sidebar(canvas, cfg)
+
+    for idx, box in enumerate(panel_boxes(cfg)):
+        render_panel(canvas, cfg, idx, box, story[idx], panel_rng(cfg.seed, idx))
+
+
+def render_panel_image(cfg: ComicConfig, idx: int, beat: StoryBeat | None = None) -> Tuple[Tuple[int, int], Image.Image]:
+    """
+    Render one panel on its own: a transparent image covering the panel's
+    box and shadow spill, plus where it goes in the strip. `beat` overrides
+    the story's beat, e.g. to re-render a single tweaked panel.
+    """
+    box = panel_boxes(cfg)[idx]
+    if beat is None:
+        beat = STORIES[cfg.theme]()[idx]
+    x0, y0, x1, y1 = panel_reach(cfg, box)
+    img = Image.new("RGBA", (x1 - x0, y1 - y0), (0, 0, 0, 0))
+    canvas = PillowCanvas(img, clip=(-x0, -y0, cfg.width - x0, cfg.height - y0), offset=(x0, y0))
+    render_panel(canvas, cfg, idx, box, beat, panel_rng(cfg.seed, idx))
+    return (x0, y0), img
+
+
+def compose_strip(cfg: ComicConfig, panels: Sequence[Tuple[Tuple[int, int], Image.Image]]) -> Image.Image:
+    # panels in strip order; later panels go over the spill of earlier ones, as when drawn in place
     img = Image.new("RGBA", (cfg.width, cfg.height), (255, 255, 255, 255))
-    draw = ImageDraw.Draw(img)
+    draw_sidebar(PillowCanvas(img), cfg)
+    for offset, panel in panels:
+        img.alpha_composite(panel, dest=offset)
+    return img
 
-    draw_sidebar(img, cfg)
 
+def render_strip(cfg: ComicConfig, workers: int = 1) -> Image.Image:
+    """
+    Render the strip. Panels are drawn into their own images, on `workers`
+    threads when more than one (Pillow drops the GIL while it rasterises and
+    blurs), and composited in order.
+    """
+    indices = range(len(panel_boxes(cfg)))
+    if workers <= 1:
+        return compose_strip(cfg, [render_panel_image(cfg, idx) for idx in indices])
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return compose_strip(cfg, list(pool.map(lambda idx: render_panel_image(cfg, idx), indices)))
+
+
+def render_svg(cfg: ComicConfig) -> str:
+    canvas = SvgCanvas(cfg.width, cfg.height)
+    draw_strip(canvas, cfg)
+    return canvas.to_svg()
+
+
+# ---------- animation ----------
+
+ANIMATION_FORMATS = {".gif": "GIF", ".png": "PNG", ".apng": "PNG", ".webp": "WEBP"}
+
+
+def tween_beat(a: StoryBeat, b: StoryBeat, t: float) -> StoryBeat:
+    """
+    Blend two beats for an in-between frame: sizes, lean, height and the portal
+    position move smoothly, everything discrete switches halfway. t=1 gives `b`.
+    """
+    if t >= 1.0 or a.extra or b.extra:
+        return b
+    src = a if t < 0.5 else b
+    dot = b.dot
+    if a.dot is not None and b.dot is not None:
+        dot = (lerp(a.dot[0], b.dot[0], t), lerp(a.dot[1], b.dot[1], t))
+    return replace(
+        src,
+        scale=lerp(a.scale, b.scale, t),
+        lean=lerp(a.lean, b.lean, t),
+        y_shift=lerp(a.y_shift, b.y_shift, t),
+        dot=dot,
+    )
+
+
+def animation_frames(cfg: ComicConfig, tweens: int = 4) -> Iterator[Tuple[Tuple[int, int], Image.Image]]:
+    """
+    Yield (offset, patch) deltas revealing the strip one panel at a time: first
+    the sidebar with empty panels, then `tweens` frames per panel easing the
+    blob from the previous beat into its own. Only the panel's region is
+    re-rendered per frame, from the panel's own RNG stream so the wobble stays
+    put, and the last frame of every panel matches render_strip().
+    """
+    story = STORIES[cfg.theme]()
     boxes = panel_boxes(cfg)
+    img = Image.new("RGBA", (cfg.width, cfg.height), (255, 255, 255, 255))
+    canvas = PillowCanvas(img)
+
+    draw_sidebar(canvas, cfg)
     for idx, box in enumerate(boxes):
-        render_background(draw, box, idx, cfg.theme)
-        beat = story[idx]
-        x0, y0, x1, y1 = box
-        pw, ph = x1 - x0, y1 - y0
+        paste_background(canvas, box, idx, cfg.theme)
+    yield (0, 0), img.copy()
 
-        if beat.extra == "empty":
-            # just portal left behind
-            portal = (x0 + pw * 0.23, y0 + ph * 0.48)
-            draw_portal(draw, portal, pw * 0.05, (90, 170, 255))
-            continue
-        if beat.extra == "empty_sky":
-            for j in range(5):
-                yy = y0 + j * ph / 5
-                col = int(lerp(240, 225, j / 4))
-                draw.line([(x0, yy), (x1, yy)], fill=(col, col, col), width=1)
+    for idx, box in enumerate(boxes):
+        region = panel_reach(cfg, box)
+        under = img.crop(region)
+        prev = story[idx - 1] if idx else story[idx]
+        steps = panel_steps(story, idx, tweens)
+        for k in range(1, steps + 1):
+            offset, panel = render_panel_image(cfg, idx, tween_beat(prev, story[idx], k / steps))
+            patch = under.copy()
+            patch.alpha_composite(panel)
+            yield offset, patch
+        img.paste(patch, region[:2])
+
+
+def panel_steps(story: Sequence[StoryBeat], idx: int, tweens: int) -> int:
+    # frames spent revealing panel idx: a tween from the previous beat, or one frame when it repeats
+    return tweens if idx and story[idx - 1] is not story[idx] else 1
+
+
+def riff_chunk(tag: bytes, data: bytes) -> bytes:
+    return tag + struct.pack("<I", len(data)) + data + b"\0" * (len(data) & 1)
+
+
+def riff_chunks(data: bytes) -> Iterator[Tuple[bytes, bytes]]:
+    # (tag, payload) of every chunk in a RIFF file such as a WebP
+    pos = 12
+    while pos + 8 <= len(data):
+        size = struct.unpack("<I", data[pos + 4:pos + 8])[0]
+        yield data[pos:pos + 4], data[pos + 8:pos + 8 + size]
+        pos += 8 + size + (size & 1)
+
+
+def save_webp_frames(path: Path, canvas: Image.Image, frames: Iterable[Tuple[int, int, Image.Image, int]]) -> None:
+    # Every frame becomes an ANMF chunk holding a lossless still WebP of just
+    # its patch. ANMF offsets are stored halved, so a patch at an odd offset
+    # grows by a pixel taken from `canvas`, which already shows the frame.
+    width, height = canvas.size
+    with open(path, "wb") as f:
+        f.write(b"RIFF\0\0\0\0WEBP")
+        f.write(riff_chunk(b"VP8X", b"\x02\0\0\0" + (width - 1).to_bytes(3, "little") + (height - 1).to_bytes(3, "little")))
+        f.write(riff_chunk(b"ANIM", struct.pack("<IH", 0xFFFFFFFF, 0)))
+        for x, y, patch, ms in frames:
+            if x % 2 or y % 2:
+                box = (x & ~1, y & ~1, x + patch.width, y + patch.height)
+                patch = canvas.crop(box)
+                x, y = box[:2]
+            buf = io.BytesIO()
+            patch.save(buf, "WEBP", lossless=True, method=4)
+            image = b"".join(riff_chunk(tag, data) for tag, data in riff_chunks(buf.getvalue()) if tag in (b"ALPH", b"VP8 ", b"VP8L"))
+            fields = (x // 2, y // 2, patch.width - 1, patch.height - 1, ms)
+            # flags: do not blend, do not dispose
+            f.write(riff_chunk(b"ANMF", b"".join(v.to_bytes(3, "little") for v in fields) + b"\x02" + image))
+        size = f.tell() - 8
+        f.seek(4)
+        f.write(struct.pack("<I", size))
+
+
+def png_idat(patch: Image.Image) -> bytes:
+    # Pillow's zlib stream (adaptively filtered rows) for an RGB patch, for an APNG frame
+    buf = io.BytesIO()
+    patch.save(buf, "PNG")
+    data = buf.getvalue()
+    idat = []
+    pos = 8
+    while pos < len(data):
+        size, tag = struct.unpack(">I4s", data[pos:pos + 8])
+        if tag == b"IDAT":
+            idat.append(data[pos + 8:pos + 8 + size])
+        pos += 12 + size
+    return b"".join(idat)
+
+
+def save_gif_frames(path: Path, frames: Iterable[Tuple[int, int, Image.Image, int]]) -> None:
+    # the first frame sets the global palette, every later patch carries its own
+    with open(path, "wb") as f:
+        for n, (x, y, patch, ms) in enumerate(frames):
+            frame = patch.convert("P", palette=Image.Palette.ADAPTIVE)
+            if n == 0:
+                header, _ = GifImagePlugin.getheader(frame, info={"loop": 0, "duration": ms})
+                f.writelines(header)
+            f.writelines(GifImagePlugin.getdata(frame, (x, y), duration=ms, disposal=1, include_color_table=n > 0))
+        f.write(b";")
+
+
+def save_animation(cfg: ComicConfig, path: Path, frame_ms: int = 120, hold_ms: int = 1500, tweens: int = 4) -> int:
+    """
+    Encode the deltas of animation_frames() as they are produced: after the
+    opening frame, each frame stores only its panel's sub-rectangle (APNG
+    fcTL/fdAT, WebP ANMF, GIF image descriptors at an offset). At most one
+    canvas is in memory and no encoder re-diffs the whole strip.
+    """
+    fmt = ANIMATION_FORMATS.get(path.suffix.lower())
+    if fmt is None:
+        raise ValueError(f"Unsupported animation format {path.suffix!r}; use one of {', '.join(sorted(ANIMATION_FORMATS))}")
+
+    story = STORIES[cfg.theme]()
+    count = 1 + sum(panel_steps(story, idx, tweens) for idx in range(len(panel_boxes(cfg))))
+
+    # the frames composed so far: each patch is cut down to what it changes
+    canvas = Image.new("RGB", (cfg.width, cfg.height))
+
+    def frames() -> Iterator[Tuple[int, int, Image.Image, int]]:
+        for n, ((x, y), patch) in enumerate(animation_frames(cfg, tweens), 1):
+            patch = patch.convert("RGB")
+            if n > 1:
+                bbox = ImageChops.difference(canvas.crop((x, y, x + patch.width, y + patch.height)), patch).getbbox()
+                bbox = bbox or (0, 0, 1, 1)
+                patch = patch.crop(bbox)
+                x, y = x + bbox[0], y + bbox[1]
+            canvas.paste(patch, (x, y))
+            yield x, y, patch, hold_ms if n == count else frame_ms
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "PNG":
+        write_apng(path, cfg.width, cfg.height, count, ((x, y, p.width, p.height, png_idat(p), ms) for x, y, p, ms in frames()))
+    elif fmt == "WEBP":
+        save_webp_frames(path, canvas, frames())
+    else:
+        save_gif_frames(path, frames())
+    return count
+
+
+# ---------- tiled rendering ----------
+
+class RecordingCanvas(Canvas):
+    """
+    Records drawing calls in absolute output pixels so a strip can be replayed
+    per tile at any scale. Layers are flattened into a white rectangle plus
+    their translated contents, which is what pasting them amounts to.
+    """
+
+    def __init__(self) -> None:
+        self.ops: List[tuple] = []
+        self.origin = (0, 0)
+
+    def _pts(self, points: Sequence[Point]) -> List[Point]:
+        ox, oy = self.origin
+        return [(x + ox, y + oy) for x, y in points]
+
+    def _box(self, box: Sequence[float]) -> Tuple[float, float, float, float]:
+        ox, oy = self.origin
+        return (box[0] + ox, box[1] + oy, box[2] + ox, box[3] + oy)
+
+    def polygon(self, points: Sequence[Point], fill: Color) -> None:
+        self.ops.append(("polygon", self._pts(points), fill))
+
+    def line(self, points: Sequence[Point], fill: Color, width: int = 1, joint: str | None = None) -> None:
+        self.ops.append(("line", self._pts(points), fill, width, joint))
+
+    def rectangle(self, box: Sequence[float], fill: Color | None = None, outline: Color | None = None, width: int = 1) -> None:
+        self.ops.append(("rectangle", self._box(box), fill, outline, width))
+
+    def ellipse(self, box: Sequence[float], fill: Color | None = None, outline: Color | None = None, width: int = 1) -> None:
+        self.ops.append(("ellipse", self._box(box), fill, outline, width))
+
+    def arc(self, box: Sequence[float], start: float, end: float, fill: Color, width: int = 1) -> None:
+        self.ops.append(("arc", self._box(box), start, end, fill, width))
+
+    def text(self, xy: Point, text: str, size: int, fill: Color, anchor: str = "la", mono: bool = False) -> None:
+        self.ops.append(("text", self._pts([xy])[0], text, size, fill, anchor, mono))
+
+    def blurred(self, shape: str, box: Sequence[float], radius: float, fill: Tuple[int, int, int, int]) -> None:
+        self.ops.append(("blurred", shape, self._box(box), radius, fill))
+
+    def layer(self, origin: Tuple[int, int], size: Tuple[int, int], paint: Callable[..., None], *args) -> None:
+        outer = self.origin
+        x0, y0 = outer[0] + origin[0], outer[1] + origin[1]
+        self.ops.append(("rectangle", (x0, y0, x0 + size[0] - 1, y0 + size[1] - 1), (255, 255, 255), None, 1))
+        self.origin = (x0, y0)
+        try:
+            paint(self, *args)
+        finally:
+            self.origin = outer
+
+
+def record_strip(cfg: ComicConfig) -> List[tuple]:
+    canvas = RecordingCanvas()
+    draw_strip(canvas, cfg)
+    return canvas.ops
+
+
+def replay(canvas: Canvas, ops: Sequence[tuple], ox: float, oy: float, ss: int) -> None:
+    """
+    Draw recorded ops scaled by `ss` with (ox, oy) supersampled pixels as the
+    origin. Points map to the centre of their ss x ss block and inclusive
+    boxes to the whole blocks they cover, so ss=1 reproduces render_strip.
+    """
+    c = (ss - 1) / 2
+
+    def pts(points: Sequence[Point]) -> List[Point]:
+        return [(x * ss + c - ox, y * ss + c - oy) for x, y in points]
+
+    def box(b: Sequence[float]) -> List[float]:
+        return [b[0] * ss - ox, b[1] * ss - oy, b[2] * ss + ss - 1 - ox, b[3] * ss + ss - 1 - oy]
+
+    for op in ops:
+        kind = op[0]
+        if kind == "polygon":
+            canvas.polygon(pts(op[1]), op[2])
+        elif kind == "line":
+            canvas.line(pts(op[1]), op[2], op[3] * ss, op[4])
+        elif kind in ("rectangle", "ellipse"):
+            getattr(canvas, kind)(box(op[1]), fill=op[2], outline=op[3], width=op[4] * ss)
+        elif kind == "arc":
+            canvas.arc(box(op[1]), op[2], op[3], op[4], op[5] * ss)
+        elif kind == "text":
+            canvas.text(pts([op[1]])[0], op[2], op[3] * ss, op[4], op[5], op[6])
+        elif kind == "blurred":
+            canvas.blurred(op[1], box(op[2]), op[3] * ss, op[4])
+
+
+def op_bounds(op: tuple) -> Tuple[float, float, float, float]:
+    # generous output-pixel extent of a recorded op, used to skip it on tiles it cannot touch
+    kind = op[0]
+    if kind in ("polygon", "line"):
+        pad = op[3] if kind == "line" else 1
+        xs = [x for x, _ in op[1]]
+        ys = [y for _, y in op[1]]
+        return (min(xs) - pad, min(ys) - pad, max(xs) + pad, max(ys) + pad)
+    if kind == "text":
+        (x, y), reach = op[1], op[3] * (len(op[2]) + 2)
+        return (x - reach, y - reach, x + reach, y + reach)
+    if kind == "blurred":
+        box, pad = op[2], blur_reach(op[3]) + 2
+    else:
+        box, pad = op[1], 1
+    return (box[0] - pad, box[1] - pad, box[2] + pad, box[3] + pad)
+
+
+TILE_OVERLAP = 8
+
+_TILE_OPS: List[tuple] = []
+_TILE_BOUNDS: List[Tuple[float, float, float, float]] = []
+_TILE_SS = 1
+_TILE_SIZE = (0, 0)
+
+
+def init_tile_worker(ops: List[tuple], ss: int, size: Tuple[int, int]) -> None:
+    global _TILE_OPS, _TILE_BOUNDS, _TILE_SS, _TILE_SIZE
+    _TILE_OPS, _TILE_BOUNDS, _TILE_SS, _TILE_SIZE = ops, [op_bounds(op) for op in ops], ss, size
+
+
+def render_tile(bounds: Tuple[int, int, int, int]) -> bytes:
+    x0, y0, x1, y1 = bounds
+    ss = _TILE_SS
+    width, height = _TILE_SIZE
+    reach = TILE_OVERLAP + 1
+    ops = [
+        op for op, (bx0, by0, bx1, by1) in zip(_TILE_OPS, _TILE_BOUNDS)
+        if bx1 >= x0 - reach and bx0 <= x1 + reach and by1 >= y0 - reach and by0 <= y1 + reach
+    ]
+    # a small overlap keeps the corners ImageDraw computes for wide lines on the tile's own side of zero
+    m = TILE_OVERLAP * ss
+    ox, oy = x0 * ss - m, y0 * ss - m
+    tile = Image.new("RGBA", ((x1 - x0) * ss + 2 * m, (y1 - y0) * ss + 2 * m), (255, 255, 255, 255))
+    replay(PillowCanvas(tile, clip=(-ox, -oy, width * ss - ox, height * ss - oy)), ops, ox, oy, ss)
+    tile = tile.crop((m, m, tile.width - m, tile.height - m))
+    if ss > 1:
+        tile = tile.reduce(ss)
+    return tile.convert("RGB").tobytes()
+
+
+def render_tiled(cfg: ComicConfig, path: Path, supersample: int = 4, tile: int = 512, workers: int = 1) -> int:
+    """
+    Render the strip tile by tile, `supersample` times larger, box-filter each
+    tile down and stream full-width bands into a PNG. Memory is bounded by one
+    band plus the tiles in flight, whatever the output size. Returns the
+    number of tiles rendered.
+    """
+    ops = record_strip(cfg)
+    ss = max(1, supersample)
+    tiles = [
+        (x, y, min(x + tile, cfg.width), min(y + tile, cfg.height))
+        for y in range(0, cfg.height, tile)
+        for x in range(0, cfg.width, tile)
+    ]
+    per_band = math.ceil(cfg.width / tile)
+
+    def bands(results: Iterator[bytes]) -> Iterator[bytes]:
+        for start in range(0, len(tiles), per_band):
+            row = tiles[start:start + per_band]
+            parts = [next(results) for _ in row]
+            bh = row[0][3] - row[0][1]
+            strides = [(t[2] - t[0]) * 3 for t in row]
+            yield b"".join(part[r * st:(r + 1) * st] for r in range(bh) for part, st in zip(parts, strides))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if workers <= 1:
+        init_tile_worker(ops, ss, (cfg.width, cfg.height))
+        write_png_rows(path, cfg.width, cfg.height, bands(map(render_tile, tiles)))
+        return len(tiles)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_tile_worker, initargs=(ops, ss, (cfg.width, cfg.height))) as pool:
+        def ordered() -> Iterator[bytes]:
+            # keep a bounded window of tiles in flight instead of queueing them all
+            window = collections.deque()
+            pending = iter(tiles)
+            for t in itertools.islice(pending, 2 * workers):
+                window.append(pool.submit(render_tile, t))
+            while window:
+                yield window.popleft().result()
+                for t in itertools.islice(pending, 1):
+                    window.append(pool.submit(render_tile, t))
+
+        write_png_rows(path, cfg.width, cfg.height, bands(ordered()))
+    return len(tiles)
+
+
+# ---------- batch rendering ----------
+
+MANIFEST_FLUSH_SECONDS = 2.0
+
+
+def config_key(cfg: ComicConfig) -> str:
+    # Everything that influences the pixels; the output path does not
+    data = asdict(cfg)
+    data.pop("out")
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def parse_seeds(spec: str) -> List[int]:
+    # "1-10,15,20-22"
+    seeds: List[int] = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
             continue
+        lo, _, hi = part.partition("-")
+        seeds.extend(range(int(lo), int(hi or lo) + 1))
+    return seeds
+
 
-        blob_box = (x0 + int(pw * 0.08), y0 + int(ph * 0.03), x1 - int(pw * 0.08), y1 - int(ph * 0.08))
+def parse_dates(spec: str) -> List[str]:
+    # "2026-03-14" or an inclusive range "2026-03-01:2026-03-31"
+    start, _, end = spec.partition(":")
+    first = date.fromisoformat(start)
+    last = date.fromisoformat(end) if end else first
+    return [str(first + timedelta(days=i)) for i in range((last - first).days + 1)]
 
-        if beat.extra == "double":
-            draw_blob(img, (x0 + int(pw * 0.06), y0 + int(ph * 0.06), x0 + int(pw * 0.62), y1 - int(ph * 0.08)),
-                      rng, expression="sad", look="left", scale=0.84)
-            draw_blob(img, (x0 + int(pw * 0.38), y0 + int(ph * 0.03), x1 - int(pw * 0.05), y1 - int(ph * 0.10)),
-                      rng, expression="neutral", look="right", scale=0.84)
+
+def batch_configs(base: ComicConfig, seeds: Sequence[int], themes: Sequence[str], dates: Sequence[str], outdir: Path) -> Iterator[ComicConfig]:
+    for date_text in dates:
+        for theme in themes:
+            for seed in seeds:
+                name = f"{date_text}-{theme}-{seed}.png"
+                yield replace(base, theme=theme, seed=seed, date_text=date_text, out=outdir / name)
+
+
+def render_job(cfg: ComicConfig) -> Tuple[str, float]:
+    started = time.perf_counter()
+    img = render_strip(cfg).convert("RGB")
+    img.save(cfg.out, "PNG")
+    return cfg.out.name, time.perf_counter() - started
+
+
+def render_batch(configs: Sequence[ComicConfig], outdir: Path, workers: int) -> Dict[str, int]:
+    outdir.mkdir(parents=True, exist_ok=True)
+    manifest_path = outdir / "manifest.json"
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8")) if manifest_path.exists() else {}
+    strips = manifest.setdefault("strips", {})
+
+    todo: List[ComicConfig] = []
+    keys: Dict[str, str] = {}
+    for cfg in configs:
+        key = config_key(cfg)
+        keys[cfg.out.name] = key
+        entry = strips.get(cfg.out.name)
+        if entry and entry.get("key") == key and entry.get("renderer") == RENDERER_VERSION and cfg.out.exists():
             continue
+        todo.append(cfg)
+
+    # strips are recorded as they finish and the manifest is flushed every
+    # few seconds, so an interrupted batch resumes where it stopped
+    rendered = 0
+    flushed = time.monotonic()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            by_name = {cfg.out.name: cfg for cfg in todo}
+            futures = [pool.submit(render_job, cfg) for cfg in todo]
+            try:
+                for future in as_completed(futures):
+                    name, seconds = future.result()
+                    data = asdict(by_name[name])
+                    data["out"] = name
+                    strips[name] = {"key": keys[name], "renderer": RENDERER_VERSION, "config": data, "seconds": round(seconds, 4)}
+                    rendered += 1
+                    if time.monotonic() - flushed >= MANIFEST_FLUSH_SECONDS:
+                        write_manifest(manifest_path, manifest)
+                        flushed = time.monotonic()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+    finally:
+        write_manifest(manifest_path, manifest)
+    return {"rendered": rendered, "skipped": len(keys) - rendered}
+
+
+def write_manifest(path: Path, manifest: Dict[str, object]) -> None:
+    # write then rename, so a crash mid-write never leaves a torn manifest
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+# ---------- render service ----------
+
+SERVE_FORMATS = {"png": ("PNG", "image/png"), "webp": ("WEBP", "image/webp")}
+SERVE_MAX_PIXELS = 8000 * 2000
+
+
+# Part of every cache key and batch manifest entry. Bump it with any change
+# that alters rendered pixels, and only then: comments, the CLI and the
+# service code leave cached strips valid.
+RENDERER_VERSION = "1"
+
+
+def render_key(cfg: ComicConfig, fmt: str) -> str:
+    return hashlib.sha256(f"{config_key(cfg)}:{fmt}:{RENDERER_VERSION}".encode("ascii")).hexdigest()
+
+
+def render_bytes(cfg: ComicConfig, fmt: str) -> bytes:
+    buf = io.BytesIO()
+    img = render_strip(cfg).convert("RGB")
+    if fmt == "webp":
+        img.save(buf, "WEBP", lossless=True, method=4)
+    else:
+        img.save(buf, "PNG")
+    return buf.getvalue()
+
+
+class RenderCache:
+    """
+    Content-addressed store of rendered strips: a size-bounded directory
+    evicted least-recently-used by mtime, fronted by an in-memory LRU of the
+    hottest entries. Concurrent misses for the same key share one render.
+    """
+
+    def __init__(self, root: Path, max_bytes: int, hot_bytes: int, pool: ProcessPoolExecutor) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hot_bytes = hot_bytes
+        self.pool = pool
+        self.hot: "collections.OrderedDict[str, bytes]" = collections.OrderedDict()
+        self.hot_size = 0
+        self.inflight: Dict[str, Future] = {}
+        self.lock = threading.Lock()
+        self.stats = collections.Counter()
+        root.mkdir(parents=True, exist_ok=True)
+        self.disk_size = sum(f.stat().st_size for f in root.glob("*.bin"))
+
+    def _remember(self, key: str, data: bytes) -> None:
+        # caller holds the lock
+        if key in self.hot or len(data) > self.hot_bytes:
+            return
+        self.hot[key] = data
+        self.hot_size += len(data)
+        while self.hot_size > self.hot_bytes:
+            _, old = self.hot.popitem(last=False)
+            self.hot_size -= len(old)
+
+    def _store(self, key: str, data: bytes) -> None:
+        path = self.root / f"{key}.bin"
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        with self.lock:
+            self.disk_size += len(data)
+            if self.disk_size <= self.max_bytes:
+                return
+            files = sorted(self.root.glob("*.bin"), key=lambda f: f.stat().st_mtime)
+            for f in files:
+                if self.disk_size <= self.max_bytes or f == path:
+                    break
+                size = f.stat().st_size
+                f.unlink(missing_ok=True)
+                self.disk_size -= size
+                self.stats["evicted"] += 1
+
+    def count(self, name: str) -> None:
+        with self.lock:
+            self.stats[name] += 1
+
+    def get(self, key: str, cfg: ComicConfig, fmt: str) -> bytes:
+        with self.lock:
+            data = self.hot.get(key)
+            if data is not None:
+                self.hot.move_to_end(key)
+                self.stats["hot"] += 1
+                return data
+            future = self.inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self.inflight[key] = future
+        if not owner:
+            self.count("shared")
+            return future.result()
 
-        features = draw_blob(
-            img, blob_box, rng,
-            expression=beat.expression,
-            look=beat.look,
-            stripes=beat.stripes,
-            framed=beat.framed,
-            cracked=beat.cracked,
-            tint=beat.tint,
-            scale=beat.scale,
-            lean=beat.lean,
-            y_shift=beat.y_shift,
-        )
+        try:
+            path = self.root / f"{key}.bin"
+            try:
+                data = path.read_bytes()
+                os.utime(path)
+                self.count("disk")
+            except FileNotFoundError:
+                data = self.pool.submit(render_bytes, cfg, fmt).result()
+                self._store(key, data)
+                self.count("rendered")
+            with self.lock:
+                self._remember(key, data)
+            future.set_result(data)
+            return data
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            with self.lock:
+                self.inflight.pop(key, None)
+
+
+def config_from_query(query: Dict[str, List[str]], base: ComicConfig) -> ComicConfig:
+    def one(name: str, default: str) -> str:
+        return query.get(name, [default])[-1]
+
+    theme = one("theme", base.theme)
+    if theme not in STORIES:
+        raise ValueError(f"unknown theme {theme!r}")
+    width, height = int(one("width", str(base.width))), int(one("height", str(base.height)))
+    if width < 200 or height < 64 or width * height > SERVE_MAX_PIXELS:
+        raise ValueError(f"unsupported size {width}x{height}")
+    date_text = one("date", str(date.today()))
+    date.fromisoformat(date_text)
+    return replace(
+        base,
+        theme=theme,
+        seed=int(one("seed", str(base.seed))),
+        width=width,
+        height=height,
+        episode=one("episode", base.episode)[:16],
+        date_text=date_text,
+    )
 
-        if beat.dot is not None:
-            dx = x0 + pw * beat.dot[0]
-            dy = y0 + ph * beat.dot[1]
-            draw_portal(draw, (dx, dy), pw * 0.045, (90, 170, 255))
-            if idx in (1, 2):
-                draw_arrow(draw, features["mouth"], (dx - 10, dy - 8))
-        if cfg.theme == "museum" and idx == 4:
-            # extra "painting" feeling
-            shadow = Image.new("RGBA", img.size, (0, 0, 0, 0))
-            sd = ImageDraw.Draw(shadow)
-            fx0, fy0, fx1, fy1 = x0 + 10, y0 + 10, x1 - 10, y1 - 10
-            sd.rectangle([fx0 + 6, fy0 + 8, fx1 + 6, fy1 + 8], fill=(0, 0, 0, 35))
-            shadow = shadow.filter(ImageFilter.GaussianBlur(3))
-            img.alpha_composite(shadow)
 
-    return img
+def etag_matches(header: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison: W/ prefixes are ignored and *
+    # matches any current representation
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*" or (tag[2:] if tag.startswith("W/") else tag) == etag:
+            return True
+    return False
+
+
+class StripHandler(BaseHTTPRequestHandler):
+    cache: RenderCache
+    base: ComicConfig
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path == "/stats":
+            with self.cache.lock:
+                stats = dict(self.cache.stats)
+            self._send(200, json.dumps(stats, sort_keys=True).encode("utf-8"), "application/json")
+            return
+        name, _, ext = url.path.lstrip("/").rpartition(".")
+        if name != "strip" or ext not in SERVE_FORMATS:
+            self._send(404, b"not found\n", "text/plain")
+            return
+        query = parse_qs(url.query)
+        try:
+            cfg = config_from_query(query, self.base)
+        except ValueError as exc:
+            self._send(400, f"{exc}\n".encode("utf-8"), "text/plain")
+            return
+        if "date" not in query:
+            # an undated URL means today's strip, which changes at midnight:
+            # send it to the dated URL, which can be cached forever
+            query["date"] = [cfg.date_text]
+            location = f"{url.path}?{urlencode(query, doseq=True)}"
+            self._send(302, b"", None, {"Location": location, "Cache-Control": "no-cache"})
+            return
+
+        key = render_key(cfg, ext)
+        etag = f'"{key}"'
+        headers = {"ETag": etag, "Cache-Control": "public, max-age=31536000, immutable"}
+        if etag_matches(self.headers.get("If-None-Match", ""), etag):
+            self.cache.count("not_modified")
+            self._send(304, b"", None, headers)
+            return
+        try:
+            data = self.cache.get(key, cfg, ext)
+        except Exception as exc:
+            self.cache.count("failed")
+            print(f"render failed for {self.path}: {exc!r}", file=sys.stderr)
+            self._send(500, b"render failed\n", "text/plain")
+            return
+        self._send(200, data, SERVE_FORMATS[ext][1], headers)
+
+    def _send(self, status: int, body: bytes, content_type: str | None, headers: Dict[str, str] | None = None) -> None:
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        if status != 304:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def serve(host: str, port: int, cache_dir: Path, cache_mb: int, hot_mb: int, workers: int, base: ComicConfig) -> None:
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        StripHandler.cache = RenderCache(cache_dir, cache_mb << 20, hot_mb << 20, pool)
+        StripHandler.base = base
+        server = ThreadingHTTPServer((host, port), StripHandler)
+        print(f"Serving strips on http://{host}:{server.server_port}/strip.png (cache {cache_dir})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+
+# ---------- benchmarks ----------
+
+def parse_sizes(spec: str) -> List[Tuple[int, int]]:
+    # "1214x256,3000x640"
+    sizes = []
+    for part in spec.split(","):
+        if part.strip():
+            w, _, h = part.strip().lower().partition("x")
+            sizes.append((int(w), int(h)))
+    return sizes
+
+
+def bench_cell(theme: str, width: int, height: int, seeds: Sequence[int], profile: bool, repeat: int = 5) -> Dict[str, object]:
+    """
+    Time render and PNG encode of one theme and size over `seeds`, `repeat`
+    times each, after a warm-up render that fills the font and layer caches.
+    The best of the repeats per seed is what baselines are compared on: noise
+    only ever adds time. Runs in its own process so the reported peak RSS
+    belongs to this cell alone.
+    """
+    base = ComicConfig(width=width, height=height, theme=theme, date_text="2026-03-14")
+    render_strip(replace(base, seed=seeds[0]))
+
+    render_s: List[float] = []
+    encode_s: List[float] = []
+    render_best: List[float] = []
+    encode_best: List[float] = []
+    for seed in seeds:
+        runs: List[Tuple[float, float]] = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            img = render_strip(replace(base, seed=seed))
+            rendered = time.perf_counter()
+            img.convert("RGB").save(io.BytesIO(), "PNG")
+            runs.append((rendered - started, time.perf_counter() - rendered))
+        render_s.extend(r for r, _ in runs)
+        encode_s.extend(e for _, e in runs)
+        render_best.append(min(r for r, _ in runs))
+        encode_best.append(min(e for _, e in runs))
+
+    result: Dict[str, object] = {
+        "theme": theme,
+        "width": width,
+        "height": height,
+        "seeds": list(seeds),
+        "repeat": repeat,
+        "render_s": round(statistics.median(render_s), 6),
+        "render_min_s": round(min(render_s), 6),
+        "encode_s": round(statistics.median(encode_s), 6),
+        # mean over seeds of each seed's best run
+        "render_best_s": round(statistics.fmean(render_best), 6),
+        "encode_best_s": round(statistics.fmean(encode_best), 6),
+    }
+
+    if profile:
+        # a separate pass, so the hooks' overhead stays out of the timings above
+        start_profile()
+        started = time.perf_counter()
+        for seed in seeds:
+            render_strip(replace(base, seed=seed))
+        total = time.perf_counter() - started
+        stats = stop_profile()
+        result["primitives"] = {
+            name: {
+                "calls": int(calls) // len(seeds),
+                "self_s": round(own / len(seeds), 6),
+                "inclusive_s": round(incl / len(seeds), 6),
+                "share": round(own / total, 4),
+            }
+            for name, (calls, incl, own) in sorted(stats.items(), key=lambda kv: -kv[1][2])
+        }
+        # canvas allocation and everything else outside the hooked primitives
+        result["unprofiled_share"] = round(1.0 - sum(own for _, _, own in stats.values()) / total, 4)
+
+    result["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return result
+
+
+def run_bench(themes: Sequence[str], sizes: Sequence[Tuple[int, int]], seeds: Sequence[int], profile: bool, repeat: int = 5) -> Dict[str, object]:
+    results = []
+    for width, height in sizes:
+        for theme in themes:
+            spec = json.dumps({"theme": theme, "width": width, "height": height, "seeds": list(seeds), "profile": profile, "repeat": repeat})
+            proc = subprocess.run([sys.executable, __file__, "--bench-cell", spec], capture_output=True, text=True, check=True)
+            cell = json.loads(proc.stdout)
+            results.append(cell)
+            print(f"{theme:>7} {width}x{height}: render {cell['render_best_s'] * 1000:8.1f} ms, "
+                  f"encode {cell['encode_best_s'] * 1000:7.1f} ms (best of {repeat}), peak {cell['peak_rss_mb']:6.1f} MB",
+                  file=sys.stderr)
+    return {
+        "renderer": RENDERER_VERSION,
+        "python": platform.python_version(),
+        "pillow": Image.__version__,
+        "results": results,
+    }
+
+
+def compare_bench(current: Dict[str, object], baseline: Dict[str, object], tolerance: float) -> List[str]:
+    """Return one line per cell whose render or encode time grew by more than `tolerance` over the baseline."""
+    def cells(report: Dict[str, object]) -> Dict[Tuple[str, int, int], Dict[str, float]]:
+        return {(c["theme"], c["width"], c["height"]): c for c in report["results"]}
+
+    old = cells(baseline)
+    regressions = []
+    for key, cell in sorted(cells(current).items()):
+        before = old.get(key)
+        if before is None:
+            continue
+        # best-of-N times when both reports have them; older reports only
+        # carry medians, which are far noisier
+        timings = ("render_best_s", "encode_best_s") if "render_best_s" in before else ("render_s", "encode_s")
+        for metric in timings + ("peak_rss_mb",):
+            ratio = cell[metric] / before[metric] if before[metric] else 1.0
+            line = f"{key[0]:>7} {key[1]}x{key[2]} {metric:<12} {before[metric]:>10} -> {cell[metric]:>10} ({ratio:5.2f}x)"
+            print(line, file=sys.stderr)
+            if ratio > 1.0 + tolerance:
+                regressions.append(line)
+    return regressions
 
 
 def build_argparser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(description="Generate a wordless comic strip in an Utterly Random-ish minimalist style.")
-    p.add_argument("--out", type=Path, default=Path("utterly-random-story.png"), help="Output PNG path.")
+    p.add_argument("--out", type=Path, default=Path("utterly-random-story.png"), help="Output path; PNG, or SVG when it ends in .svg.")
     p.add_argument("--theme", choices=sorted(STORIES) + ["random"], default="museum", help="Story template.")
     p.add_argument("--seed", type=int, default=1, help="Random seed.")
     p.add_argument("--width", type=int, default=1214, help="Canvas width.")
     p.add_argument("--height", type=int, default=256, help="Canvas height.")
     p.add_argument("--episode", default="random", help="Episode label shown in the gutter.")
     p.add_argument("--date", dest="date_text", default=str(date.today()), help="Date label, e.g. 2026-03-14.")
+    p.add_argument("--batch", action="store_true", help="Render every combination of --seeds, --themes and --dates.")
+    p.add_argument("--seeds", default="1", help="Batch seeds, e.g. 1-100 or 1,5,9-12.")
+    p.add_argument("--themes", default=",".join(sorted(STORIES)), help="Batch themes, comma separated.")
+    p.add_argument("--dates", default=None, help="Batch dates, e.g. 2026-03-01:2026-03-31 (default: --date).")
+    p.add_argument("--outdir", type=Path, default=Path("strips"), help="Batch output directory.")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes for batch and tiled rendering, threads for a single strip.")
+    p.add_argument("--serve", action="store_true", help="Run an HTTP service answering /strip.png and /strip.webp?theme=&seed=&date=&width=&height=&episode=.")
+    p.add_argument("--host", default="127.0.0.1", help="Service bind address.")
+    p.add_argument("--port", type=int, default=8080, help="Service port.")
+    p.add_argument("--cache-dir", type=Path, default=Path("strip-cache"), help="Service render cache directory.")
+    p.add_argument("--cache-mb", type=int, default=512, help="Service disk cache size in MiB.")
+    p.add_argument("--hot-mb", type=int, default=64, help="Service in-memory cache size in MiB.")
+    p.add_argument("--bench", action="store_true", help="Benchmark every theme in --themes over --sizes and --seeds and print a JSON report.")
+    p.add_argument("--sizes", default="1214x256,3000x640,6000x1280", help="Benchmark sizes, e.g. 1214x256,3000x640.")
+    p.add_argument("--profile", action="store_true", help="Benchmark: also report time per drawing primitive.")
+    p.add_argument("--bench-out", type=Path, default=None, help="Benchmark: write the JSON report here instead of stdout.")
+    p.add_argument("--baseline", type=Path, default=None, help="Benchmark: compare against a saved report and exit 1 on regressions.")
+    p.add_argument("--tolerance", type=float, default=0.25, help="Benchmark: allowed slowdown of the best-run times against --baseline, as a fraction.")
+    p.add_argument("--repeat", type=int, default=5, help="Benchmark: runs per seed; the best one counts.")
+    p.add_argument("--bench-cell", default=None, help=argparse.SUPPRESS)
+    p.add_argument("--supersample", type=int, default=1, help="Render N times larger and downsample, in tiles (implies --tile 512).")
+    p.add_argument("--tile", type=int, default=0, help="Render in tiles of this many output pixels and stream them to the PNG.")
+    p.add_argument("--panel", type=int, default=None, help="Render only this panel (0-based) to --out.")
+    p.add_argument("--animate", action="store_true", help="Write an animation revealing one panel at a time; format from --out (.gif, .png/.apng, .webp).")
+    p.add_argument("--frame-ms", type=int, default=120, help="Animation frame duration in milliseconds.")
+    p.add_argument("--tweens", type=int, default=4, help="Animation frames per panel.")
     return p
 
 
 def main() -> int:
     args = build_argparser().parse_args()
+    script_dir = Path(__file__).resolve().parent
+
+    if args.bench_cell:
+        spec = json.loads(args.bench_cell)
+        print(json.dumps(bench_cell(spec["theme"], spec["width"], spec["height"], spec["seeds"], spec["profile"], spec["repeat"])))
+        return 0
+
+    if args.bench:
+        themes = [t.strip() for t in args.themes.split(",") if t.strip()]
+        unknown = sorted(set(themes) - set(STORIES))
+        if unknown:
+            raise SystemExit(f"Unknown theme(s): {', '.join(unknown)}")
+        report = run_bench(themes, parse_sizes(args.sizes), parse_seeds(args.seeds), args.profile, max(1, args.repeat))
+        text = json.dumps(report, indent=2)
+        if args.bench_out:
+            args.bench_out.write_text(text + "\n", encoding="utf-8")
+        else:
+            print(text)
+        if args.baseline:
+            regressions = compare_bench(report, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+            if regressions:
+                print(f"{len(regressions)} regression(s) over {args.tolerance:.0%}", file=sys.stderr)
+                return 1
+        return 0
+
+    if args.serve:
+        cache_dir = args.cache_dir.expanduser()
+        if not cache_dir.is_absolute():
+            cache_dir = (script_dir / cache_dir).resolve()
+        base = ComicConfig(width=args.width, height=args.height, episode=args.episode, seed=args.seed,
+                           theme=args.theme if args.theme in STORIES else "museum")
+        serve(args.host, args.port, cache_dir, args.cache_mb, args.hot_mb, args.workers, base)
+        return 0
+
+    if args.batch:
+        themes = [t.strip() for t in args.themes.split(",") if t.strip()]
+        unknown = sorted(set(themes) - set(STORIES))
+        if unknown:
+            raise SystemExit(f"Unknown theme(s): {', '.join(unknown)}")
+        outdir = args.outdir.expanduser()
+        if not outdir.is_absolute():
+            outdir = (script_dir / outdir).resolve()
+        base = ComicConfig(width=args.width, height=args.height, episode=args.episode)
+        configs = list(batch_configs(base, parse_seeds(args.seeds), themes, parse_dates(args.dates or args.date_text), outdir))
+        counts = render_batch(configs, outdir, args.workers)
+        print(f"Rendered {counts['rendered']}, skipped {counts['skipped']} existing strip(s) in {outdir}")
+        return 0
+
     theme = random.choice(sorted(STORIES)) if args.theme == "random" else args.theme
 
-    script_dir = Path(__file__).resolve().parent
     out_path = args.out.expanduser()
     if not out_path.is_absolute():
         out_path = (script_dir / out_path).resolve()
@@ -502,8 +1797,35 @@ def main() -> int:
         out=out_path,
         seed=args.seed,
     )
-    img = render_strip(cfg).convert("RGB")
+    if args.animate:
+        count = save_animation(cfg, cfg.out, frame_ms=args.frame_ms, tweens=max(1, args.tweens))
+        print(f"Wrote {cfg.out} ({count} frames)")
+        return 0
+
     cfg.out.parent.mkdir(parents=True, exist_ok=True)
+    if cfg.out.suffix.lower() == ".svg":
+        cfg.out.write_text(render_svg(cfg), encoding="utf-8")
+        print(f"Wrote {cfg.out}")
+        return 0
+
+    if args.tile > 0 or args.supersample > 1:
+        count = render_tiled(cfg, cfg.out, supersample=args.supersample, tile=args.tile or 512, workers=args.workers)
+        print(f"Wrote {cfg.out} ({count} tiles)")
+        return 0
+
+    if args.panel is not None:
+        boxes = panel_boxes(cfg)
+        if not 0 <= args.panel < len(boxes):
+            raise SystemExit(f"--panel must be between 0 and {len(boxes) - 1}")
+        (ox, oy), panel = render_panel_image(cfg, args.panel)
+        x0, y0, x1, y1 = boxes[args.panel]
+        img = Image.new("RGBA", panel.size, (255, 255, 255, 255))
+        img.alpha_composite(panel)
+        img.crop((x0 - ox, y0 - oy, x1 + 1 - ox, y1 + 1 - oy)).convert("RGB").save(cfg.out, "PNG")
+        print(f"Wrote panel {args.panel} to {cfg.out}")
+        return 0
+
+    img = render_strip(cfg, workers=args.workers).convert("RGB")
     img.save(cfg.out, "PNG")
     print(f"Wrote {cfg.out}")
     return 0